@@ -19,12 +19,20 @@ import sys
 import time
 import json
 import hashlib
+import errno
 import subprocess
 import threading
+import select
+import socket
+import sqlite3
+import collections
+import concurrent.futures
 from datetime import datetime
 from pathlib import Path
 import re
 
+from SIGNATURE_PACK import PackWatcher, sha256_file, tier1_fingerprint
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -32,6 +40,37 @@ import re
 SCANNER_LOG = "/tmp/cross_device_scanner.log"
 DEVICE_LOG = "/tmp/cross_device_devices.log"
 THREAT_LOG = "/tmp/cross_device_threats.log"
+# Compiled signature pack shared with SIGNATURE RADAR (see SIGNATURE_PACK.py);
+# replaces CROSS_DEVICE_SIGNATURES and supplies the known-threat hashes
+SIGNATURE_PACK_PATH = "/tmp/signature_radar.pack"
+# Known-threat hashing: every file gets a tier-1 fingerprint (size, head,
+# tail and middle samples); a full SHA256 is computed when that hits the
+# pack, for files up to FULL_HASH_AUTO_BYTES, or for every file up to
+# FULL_HASH_MAX_BYTES with FULL_HASH_POLICY = 'always'
+FULL_HASH_POLICY = 'tier1'
+FULL_HASH_AUTO_BYTES = 1024 * 1024
+FULL_HASH_MAX_BYTES = 100 * 1024 * 1024
+# Persistent device registry: devices keyed by filesystem UUID (else disk
+# serial) with the manifest of their last scan, so a re-plugged device only
+# re-evaluates files whose size or mtime changed
+DEVICE_REGISTRY_DB = "/tmp/cross_device_registry.sqlite"
+DEV_DISK_BY_UUID = "/dev/disk/by-uuid"
+# Device discovery sources
+MOUNTINFO = "/proc/self/mountinfo"
+SYS_BLOCK = "/sys/block"
+SYS_USB_DEVICES = "/sys/bus/usb/devices"
+REMOVABLE_MOUNT_DIRS = ['/media', '/mnt', '/run/media']
+# Event mode: kernel uevents (NETLINK_KOBJECT_UEVENT, kernel multicast group)
+# plus mount table changes wake the monitor; after a block device event it
+# waits up to UEVENT_SETTLE_SECONDS for the device to be mounted
+NETLINK_KOBJECT_UEVENT = 15
+UEVENT_KERNEL_GROUP = 1
+UEVENT_BUFFER_SIZE = 64 * 1024
+UEVENT_SETTLE_SECONDS = 2.0
+# Monitor: device scans run on DEVICE_SCAN_WORKERS threads, at most
+# SCANS_PER_BLOCK_DEVICE at a time on one physical disk
+DEVICE_SCAN_WORKERS = 4
+SCANS_PER_BLOCK_DEVICE = 1
 
 # ============================================================================
 # CROSS-DEVICE THREAT SIGNATURES
@@ -112,40 +151,242 @@ CROSS_DEVICE_SIGNATURES = {
     }
 }
 
+def compile_signatures(signatures):
+    """Return a copy of signatures with lowercased file literals precomputed"""
+    compiled = {}
+    for sig_name, sig_data in signatures.items():
+        sig_data = dict(sig_data)
+        if 'files' in sig_data:
+            sig_data['files_lower'] = [pattern.lower() for pattern in sig_data['files']]
+        compiled[sig_name] = sig_data
+    return compiled
+
+SIGNATURE_PACK = PackWatcher(SIGNATURE_PACK_PATH, log=lambda message, level: log_message(message, level))
+_BUILTIN_SIGNATURES = compile_signatures(CROSS_DEVICE_SIGNATURES)
+
+def current_signatures():
+    """Signatures from the installed signature pack, else the built-in ones"""
+    pack = SIGNATURE_PACK.current()
+    section = pack.section_json('cross_device') if pack is not None else None
+    if section and 'signatures' in section:
+        return section['signatures']
+    return _BUILTIN_SIGNATURES
+
+class ScanPlan:
+    """The signatures that apply to one device type, compiled for per-file matching.
+
+    File literals keep their substring semantics ('.js' also matches
+    'app.json'): one keyword regex finds every literal in the lowercased
+    name in a single pass, overlapping ones included. The 'patterns' of all
+    signatures are joined into one path regex that must match the name or
+    path before the individual patterns are tried.
+    """
+
+    def __init__(self, signatures, device_type):
+        self.source = signatures
+        self.device_type = device_type
+        self.signatures = []
+        self.owners = {}
+        self.pattern_signatures = []
+        sources = []
+        for sig_name, sig_data in signatures.items():
+            # Same device filter as before: the device type, or anything 'usb'
+            devices = sig_data.get('devices', [])
+            if device_type not in devices and 'usb' not in devices:
+                continue
+            index = len(self.signatures)
+            self.signatures.append((sig_name, sig_data))
+            files_lower = sig_data.get('files_lower') or [pattern.lower() for pattern in sig_data.get('files', [])]
+            for position, lowered in enumerate(files_lower):
+                self.owners.setdefault(lowered, []).append((index, position))
+            if sig_data.get('patterns'):
+                compiled = [re.compile(pattern, re.IGNORECASE) for pattern in sig_data['patterns']]
+                self.pattern_signatures.append((index, compiled))
+                sources.extend(sig_data['patterns'])
+        
+        # Longest literal first, so the match at each position is the longest
+        # one; every other literal starting there is one of its substrings
+        literals = sorted((literal for literal in self.owners if literal), key=len, reverse=True)
+        self.implied = {literal: [other for other in literals if other in literal] for literal in literals}
+        self.keywords = re.compile('(?=(' + '|'.join(map(re.escape, literals)) + '))') if literals else None
+        self.empty_literal = '' in self.owners
+        
+        self.path_regex = None
+        if sources:
+            try:
+                self.path_regex = re.compile('|'.join(f'(?:{pattern})' for pattern in sources), re.IGNORECASE)
+            except re.error:
+                # Patterns that cannot be combined are tried one by one
+                pass
+
+    def match(self, file_name, file_path):
+        """Return [(sig_name, sig_data, pattern)] for a lowercased file name and its path"""
+        file_hits = {}
+        if self.keywords is not None or self.empty_literal:
+            found = {''} if self.empty_literal else set()
+            if self.keywords is not None:
+                for m in self.keywords.finditer(file_name):
+                    literal = m.group(1)
+                    if literal not in found:
+                        found.update(self.implied[literal])
+            for literal in found:
+                for index, position in self.owners[literal]:
+                    if position < file_hits.get(index, position + 1):
+                        file_hits[index] = position
+        
+        pattern_hits = {}
+        if self.pattern_signatures and (self.path_regex is None or
+                                        self.path_regex.search(file_name) or self.path_regex.search(file_path)):
+            for index, compiled in self.pattern_signatures:
+                for regex in compiled:
+                    if regex.search(file_name) or regex.search(file_path):
+                        pattern_hits[index] = regex.pattern
+                        break
+        
+        if not file_hits and not pattern_hits:
+            return []
+        matches = []
+        for index, (sig_name, sig_data) in enumerate(self.signatures):
+            if index in file_hits:
+                matches.append((sig_name, sig_data, sig_data['files'][file_hits[index]]))
+            if index in pattern_hits:
+                matches.append((sig_name, sig_data, pattern_hits[index]))
+        return matches
+
+_SCAN_PLANS = {}
+_scan_plans_lock = threading.Lock()
+
+def get_scan_plan(device_type, signatures=None):
+    """Compiled plan for a device type, rebuilt when the signatures change"""
+    if signatures is None:
+        signatures = current_signatures()
+    with _scan_plans_lock:
+        plan = _SCAN_PLANS.get(device_type)
+        if plan is None or plan.source is not signatures:
+            plan = ScanPlan(signatures, device_type)
+            _SCAN_PLANS[device_type] = plan
+        return plan
+
 # ============================================================================
 # DEVICE DETECTION
 # ============================================================================
 
-def detect_usb_devices():
-    """Detect all USB/removable devices"""
+# ----------------------------------------------------------------------------
+# /proc and /sys readers
+# ----------------------------------------------------------------------------
+
+def _unescape_mount_path(path):
+    """Decode the octal escapes (\\040 etc.) used in mountinfo paths"""
+    return re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), path)
+
+def read_mountinfo(path=MOUNTINFO):
+    """Return [{'dev', 'mountpoint', 'fstype', 'source'}] from a mountinfo file"""
+    mounts = []
+    with open(path, 'r') as f:
+        for line in f:
+            fields = line.split()
+            try:
+                sep = fields.index('-', 6)
+            except ValueError:
+                continue
+            mounts.append({
+                'dev': fields[2],
+                'mountpoint': _unescape_mount_path(fields[4]),
+                'fstype': fields[sep + 1] if len(fields) > sep + 1 else '',
+                'source': _unescape_mount_path(fields[sep + 2]) if len(fields) > sep + 2 else ''
+            })
+    return mounts
+
+def _read_sys(path, default=''):
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return default
+
+def list_block_devices(sys_block=SYS_BLOCK):
+    """Yield (name, type, sysfs dir) for every disk and partition in /sys/block"""
+    for name in sorted(os.listdir(sys_block)):
+        disk_dir = os.path.join(sys_block, name)
+        if name.startswith('loop'):
+            device_type = 'loop'
+        elif name.startswith('sr'):
+            device_type = 'rom'
+        else:
+            device_type = 'disk'
+        yield name, device_type, disk_dir
+        try:
+            children = sorted(os.listdir(disk_dir))
+        except OSError:
+            continue
+        for child in children:
+            if child.startswith(name) and os.path.exists(os.path.join(disk_dir, child, 'partition')):
+                yield child, 'part', os.path.join(disk_dir, child)
+
+def block_device_of(path):
+    """Return the whole-disk block device name backing path (e.g. 'sdb' for sdb1)
+
+    Falls back to 'dev:<major>:<minor>' for devices without a /sys entry
+    (network and virtual filesystems). Shared with SIGNATURE RADAR.
+    """
+    try:
+        st_dev = os.stat(path).st_dev
+    except OSError:
+        return None
+    major, minor = os.major(st_dev), os.minor(st_dev)
+    try:
+        real = os.path.realpath(f"/sys/dev/block/{major}:{minor}")
+        if os.path.exists(os.path.join(real, 'partition')):
+            real = os.path.dirname(real)
+        if os.path.isdir(real):
+            return os.path.basename(real)
+    except OSError:
+        pass
+    return f"dev:{major}:{minor}"
+
+def list_usb_devices(sys_usb=SYS_USB_DEVICES):
+    """Yield lsusb-style (vendor:product, description) for devices in /sys/bus/usb/devices"""
+    try:
+        entries = sorted(os.listdir(sys_usb))
+    except OSError:
+        return
+    for entry in entries:
+        device_dir = os.path.join(sys_usb, entry)
+        vendor = _read_sys(os.path.join(device_dir, 'idVendor'))
+        if not vendor:
+            continue  # interfaces have no idVendor
+        product = _read_sys(os.path.join(device_dir, 'idProduct'))
+        busnum = _read_sys(os.path.join(device_dir, 'busnum'), '0')
+        devnum = _read_sys(os.path.join(device_dir, 'devnum'), '0')
+        label = ' '.join(filter(None, [_read_sys(os.path.join(device_dir, 'manufacturer')),
+                                       _read_sys(os.path.join(device_dir, 'product'))]))
+        description = f"Bus {int(busnum):03d} Device {int(devnum):03d}: ID {vendor}:{product}"
+        yield f"{vendor}:{product}", f"{description} {label}".strip()
+
+def _detect_usb_devices_commands():
+    """Fallback for hosts without /proc/self/mountinfo or /sys/block: lsblk, lsusb and ismount"""
     devices = []
-    
-    # Check mounted devices
     try:
-        result = subprocess.run(['lsblk', '-o', 'NAME,SIZE,TYPE,MOUNTPOINT,FSTYPE'], 
+        # -P prints KEY="value" pairs, so empty columns (unmounted rows) keep their place
+        result = subprocess.run(['lsblk', '-P', '-o', 'NAME,SIZE,TYPE,MOUNTPOINT,FSTYPE'],
                               capture_output=True, text=True, timeout=5)
         if result.returncode == 0:
-            for line in result.stdout.split('\n')[1:]:  # Skip header
-                if line.strip():
-                    parts = line.split()
-                    if len(parts) >= 4:
-                        device_name = parts[0]
-                        device_type = parts[2] if len(parts) > 2 else ''
-                        mountpoint = parts[3] if len(parts) > 3 else ''
-                        
-                        # Check if removable
-                        if 'disk' in device_type or mountpoint.startswith('/media') or mountpoint.startswith('/mnt'):
-                            devices.append({
-                                'name': device_name,
-                                'type': device_type,
-                                'mountpoint': mountpoint,
-                                'detected_at': datetime.now().isoformat()
-                            })
+            for line in result.stdout.split('\n'):
+                row = dict(re.findall(r'(\w+)="([^"]*)"', line))
+                if not row:
+                    continue
+                mountpoint = row.get('MOUNTPOINT', '')
+                if row.get('TYPE') == 'disk' or mountpoint.startswith('/media') or mountpoint.startswith('/mnt'):
+                    devices.append({
+                        'name': row.get('NAME', ''),
+                        'type': row.get('TYPE', ''),
+                        'mountpoint': mountpoint,
+                        'detected_at': datetime.now().isoformat()
+                    })
     except:
         pass
     
-    # Check /media and /mnt
-    for mount_dir in ['/media', '/mnt', '/run/media']:
+    for mount_dir in REMOVABLE_MOUNT_DIRS:
         if os.path.exists(mount_dir):
             for item in os.listdir(mount_dir):
                 mount_path = os.path.join(mount_dir, item)
@@ -157,25 +398,82 @@ def detect_usb_devices():
                         'detected_at': datetime.now().isoformat()
                     })
     
-    # Check USB devices via lsusb
     try:
         result = subprocess.run(['lsusb'], capture_output=True, text=True, timeout=5)
         if result.returncode == 0:
             for line in result.stdout.split('\n'):
-                if line.strip():
-                    # Extract device info
-                    match = re.search(r'ID ([0-9a-f]{4}):([0-9a-f]{4})', line)
-                    if match:
-                        devices.append({
-                            'usb_id': f"{match.group(1)}:{match.group(2)}",
-                            'description': line.strip(),
-                            'detected_at': datetime.now().isoformat()
-                        })
+                match = re.search(r'ID ([0-9a-f]{4}):([0-9a-f]{4})', line)
+                if match:
+                    devices.append({
+                        'usb_id': f"{match.group(1)}:{match.group(2)}",
+                        'description': line.strip(),
+                        'detected_at': datetime.now().isoformat()
+                    })
     except:
         pass
     
     return devices
 
+def detect_usb_devices():
+    """Detect all USB/removable devices
+
+    Reads /proc/self/mountinfo, /sys/block and /sys/bus/usb/devices
+    directly (no subprocesses); falls back to lsblk/lsusb elsewhere.
+    """
+    try:
+        mounts = read_mountinfo()
+        block_devices = list(list_block_devices())
+    except OSError:
+        return _detect_usb_devices_commands()
+    
+    detected_at = datetime.now().isoformat()
+    devices = []
+    mountpoint_of = {}
+    for mount in mounts:
+        mountpoint_of.setdefault(mount['dev'], mount)
+    
+    # Disks (mounted or not) and anything mounted under the removable mount dirs
+    for name, device_type, sys_dir in block_devices:
+        size = int(_read_sys(os.path.join(sys_dir, 'size'), '0') or 0) * 512
+        if device_type == 'loop' and not size:
+            continue  # detached loop device
+        mount = mountpoint_of.get(_read_sys(os.path.join(sys_dir, 'dev')), {})
+        mountpoint = mount.get('mountpoint', '')
+        if device_type == 'disk' or mountpoint.startswith('/media') or mountpoint.startswith('/mnt'):
+            disk_dir = sys_dir if device_type != 'part' else os.path.dirname(sys_dir)
+            devices.append({
+                'name': name,
+                'type': device_type,
+                'mountpoint': mountpoint,
+                'fstype': mount.get('fstype', ''),
+                'size': size,
+                'removable': _read_sys(os.path.join(disk_dir, 'removable')) == '1',
+                'detected_at': detected_at
+            })
+    
+    # Check /media, /mnt and /run/media, including per-user <dir>/<user>/<label> mounts
+    for mount in mounts:
+        mountpoint = mount['mountpoint']
+        if any(mountpoint.startswith(mount_dir + '/') and mountpoint.count('/') - mount_dir.count('/') <= 2
+               for mount_dir in REMOVABLE_MOUNT_DIRS):
+            devices.append({
+                'name': os.path.basename(mountpoint),
+                'mountpoint': mountpoint,
+                'type': 'removable',
+                'source': mount['source'],
+                'detected_at': detected_at
+            })
+    
+    # USB devices as lsusb would list them
+    for usb_id, description in list_usb_devices():
+        devices.append({
+            'usb_id': usb_id,
+            'description': description,
+            'detected_at': detected_at
+        })
+    
+    return devices
+
 def identify_device_type(mountpoint):
     """Identify device type (phone, Xbox, MP3 player, etc.)"""
     if not mountpoint or not os.path.exists(mountpoint):
@@ -212,8 +510,13 @@ def identify_device_type(mountpoint):
 # THREAT SCANNING
 # ============================================================================
 
-def scan_device_for_threats(mountpoint, device_type='unknown'):
-    """Scan device for cross-platform threats"""
+def scan_device_for_threats(mountpoint, device_type='unknown', cancel=None, manifest=None):
+    """Scan device for cross-platform threats
+
+    Setting the cancel event stops the scan at the next file; the threats
+    found so far are returned. With a ScanManifest, hash checks of files
+    unchanged since the previous scan are answered from it.
+    """
     threats = []
     
     if not os.path.exists(mountpoint):
@@ -222,88 +525,279 @@ def scan_device_for_threats(mountpoint, device_type='unknown'):
     log_message(f"Scanning device: {mountpoint} (Type: {device_type})")
     
     try:
+        # One plan for the whole scan, even if a new pack lands meanwhile
+        plan = get_scan_plan(device_type)
+        prefix = os.path.join(mountpoint, '')
+        
         # Scan files
         for root, dirs, files in os.walk(mountpoint):
             # Skip system directories
             skip_dirs = ['.Trash', 'System Volume Information', '$RECYCLE', '.Spotlight-V100']
             dirs[:] = [d for d in dirs if d not in skip_dirs]
             
+            if cancel is not None and cancel.is_set():
+                break
+            
             for file in files:
+                if cancel is not None and cancel.is_set():
+                    break
                 file_path = os.path.join(root, file)
                 file_name = file.lower()
                 
                 # Check against signatures
-                for sig_name, sig_data in CROSS_DEVICE_SIGNATURES.items():
-                    # Check if signature applies to this device type
-                    if device_type not in sig_data.get('devices', []) and 'usb' not in sig_data.get('devices', []):
-                        continue
-                    
-                    # Check file extensions
-                    if 'files' in sig_data:
-                        for pattern in sig_data['files']:
-                            if file_name.endswith(pattern.lower()) or pattern.lower() in file_name:
-                                threats.append({
-                                    'file': file_path,
-                                    'signature': sig_name,
-                                    'description': sig_data['description'],
-                                    'severity': sig_data['severity'],
-                                    'device_type': device_type,
-                                    'pattern': pattern,
-                                    'timestamp': datetime.now().isoformat()
-                                })
-                                break
-                    
-                    # Check patterns
-                    if 'patterns' in sig_data:
-                        for pattern in sig_data['patterns']:
-                            if re.search(pattern, file_name, re.IGNORECASE) or \
-                               re.search(pattern, file_path, re.IGNORECASE):
-                                threats.append({
-                                    'file': file_path,
-                                    'signature': sig_name,
-                                    'description': sig_data['description'],
-                                    'severity': sig_data['severity'],
-                                    'device_type': device_type,
-                                    'pattern': pattern,
-                                    'timestamp': datetime.now().isoformat()
-                                })
-                                break
+                for sig_name, sig_data, pattern in plan.match(file_name, file_path):
+                    threats.append({
+                        'file': file_path,
+                        'signature': sig_name,
+                        'description': sig_data['description'],
+                        'severity': sig_data['severity'],
+                        'device_type': device_type,
+                        'pattern': pattern,
+                        'timestamp': datetime.now().isoformat()
+                    })
                 
                 # Check file hash for known threats
                 try:
-                    if os.path.getsize(file_path) < 100 * 1024 * 1024:  # Skip files > 100MB
-                        file_hash = calculate_file_hash(file_path)
-                        if file_hash and is_known_threat(file_hash):
-                            threats.append({
-                                'file': file_path,
-                                'hash': file_hash,
-                                'signature': 'known_threat_hash',
-                                'description': 'Known threat hash match',
-                                'severity': 'CRITICAL',
-                                'device_type': device_type,
-                                'timestamp': datetime.now().isoformat()
-                            })
+                    if manifest is None:
+                        file_hash = match_known_threat(file_path, os.path.getsize(file_path))
+                    else:
+                        file_hash = manifest.check(file_path[len(prefix):], file_path)
+                    if file_hash:
+                        threats.append({
+                            'file': file_path,
+                            'hash': file_hash,
+                            'signature': 'known_threat_hash',
+                            'description': 'Known threat hash match',
+                            'severity': 'CRITICAL',
+                            'device_type': device_type,
+                            'timestamp': datetime.now().isoformat()
+                        })
                 except:
                     pass
     except Exception as e:
         log_message(f"Error scanning {mountpoint}: {e}", "ERROR")
     
+    if cancel is not None and cancel.is_set():
+        log_message(f"Scan of {mountpoint} cancelled; {len(threats)} threats found before cancellation", "WARNING")
     return threats
 
 def calculate_file_hash(file_path):
     """Calculate SHA256 hash of file"""
-    try:
-        with open(file_path, 'rb') as f:
-            content = f.read(1024 * 1024)  # Read first 1MB for speed
-        return hashlib.sha256(content).hexdigest()
-    except:
-        return None
+    return sha256_file(file_path)
 
 def is_known_threat(file_hash):
     """Check if file hash matches known threat"""
-    # This would check against a threat database
-    # For now, return False
-    return False
+    pack = SIGNATURE_PACK.current()
+    return pack is not None and pack.contains_hash(file_hash)
+
+_untiered_pack_logged = None
+
+def match_known_threat(file_path, size, fingerprints=None):
+    """Return the SHA256 of a file if it is a known threat, else None
+
+    Large files are only read in full when their tier-1 fingerprint is in
+    the pack (or FULL_HASH_POLICY is 'always'). Packs built from hash feeds
+    alone have no tier-1 keys, so for them every file up to
+    FULL_HASH_MAX_BYTES is hashed in full. fingerprints, if given, is
+    a dict of already known 'tier1'/'sha256' values for the file; the ones
+    computed here are added to it.
+    """
+    pack = SIGNATURE_PACK.current()
+    if pack is None:
+        return None
+    if fingerprints is None:
+        fingerprints = {}
+    if size > FULL_HASH_AUTO_BYTES:
+        if not pack.tier1_count:
+            global _untiered_pack_logged
+            if _untiered_pack_logged != pack.digest:
+                _untiered_pack_logged = pack.digest
+                log_message(f"Signature pack {pack.version} has no tier-1 fingerprints; "
+                            f"tier-1 prefiltering disabled, hashing files up to "
+                            f"{FULL_HASH_MAX_BYTES} bytes in full", "WARNING")
+            if size > FULL_HASH_MAX_BYTES:
+                return None
+            full_hash = True
+        else:
+            full_hash = FULL_HASH_POLICY == 'always' and size <= FULL_HASH_MAX_BYTES
+        if not full_hash:
+            if not fingerprints.get('tier1'):
+                fingerprints['tier1'] = tier1_fingerprint(file_path, size)
+            if not pack.contains_tier1(fingerprints['tier1']):
+                return None
+    if not fingerprints.get('sha256'):
+        fingerprints['sha256'] = calculate_file_hash(file_path)
+    file_hash = fingerprints['sha256']
+    if file_hash and pack.contains_hash(file_hash):
+        return file_hash
+    return None
+
+def signature_tag():
+    """Identifies the hash verdicts the current pack and policy produce"""
+    pack = SIGNATURE_PACK.current()
+    return f"{pack.digest if pack is not None else 'builtin'}:{FULL_HASH_POLICY}"
+
+# ============================================================================
+# DEVICE REGISTRY
+# ============================================================================
+
+def device_identity(mountpoint, by_uuid=DEV_DISK_BY_UUID):
+    """Stable key for the filesystem at mountpoint, or None.
+
+    'uuid:<filesystem UUID>' from /dev/disk/by-uuid, else
+    'serial:<disk serial>:<partition number>' from the nearest sysfs
+    ancestor of the disk that has a serial (the USB device).
+    """
+    try:
+        st_dev = os.stat(mountpoint).st_dev
+    except OSError:
+        return None
+    sys_dir = os.path.realpath(f"/sys/dev/block/{os.major(st_dev)}:{os.minor(st_dev)}")
+    name = os.path.basename(sys_dir)
+    try:
+        for uuid in os.listdir(by_uuid):
+            if os.path.basename(os.path.realpath(os.path.join(by_uuid, uuid))) == name:
+                return f"uuid:{uuid}"
+    except OSError:
+        pass
+    partition = _read_sys(os.path.join(sys_dir, 'partition'))
+    disk_dir = os.path.dirname(sys_dir) if partition else sys_dir
+    node = os.path.realpath(os.path.join(disk_dir, 'device'))
+    while node.startswith('/sys/devices/'):
+        serial = _read_sys(os.path.join(node, 'serial'))
+        if serial:
+            return f"serial:{serial}:{partition or 0}"
+        node = os.path.dirname(node)
+    return None
+
+
+class ScanManifest:
+    """Per-file hash results of one device scan, checked against the previous one.
+
+    Entries are path (relative to the mountpoint) -> (size, mtime_ns,
+    tier1, sha256, verdict). A file whose size and mtime still match keeps
+    its fingerprints, so it is not read again; while the signature tag is
+    unchanged its verdict is reused as well.
+    """
+
+    def __init__(self, previous=None, reuse_verdicts=False, tag=None):
+        self.previous = previous or {}
+        self.reuse_verdicts = reuse_verdicts
+        self.tag = tag if tag is not None else signature_tag()
+        self.entries = {}
+        self.reused = 0
+        self.evaluated = 0
+
+    def check(self, rel_path, file_path):
+        """Return the SHA256 of a known threat, else None (as match_known_threat)"""
+        st = os.stat(file_path)
+        entry = self.previous.get(rel_path)
+        fingerprints = {}
+        if entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            if self.reuse_verdicts:
+                self.reused += 1
+                self.entries[rel_path] = entry
+                return entry[3] if entry[4] == 'known_threat' else None
+            fingerprints = {'tier1': entry[2], 'sha256': entry[3]}
+        self.evaluated += 1
+        file_hash = match_known_threat(file_path, st.st_size, fingerprints)
+        self.entries[rel_path] = (st.st_size, st.st_mtime_ns, fingerprints.get('tier1'),
+                                  fingerprints.get('sha256'), 'known_threat' if file_hash else 'clean')
+        return file_hash
+
+
+class DeviceRegistry:
+    """Devices seen before and the manifest of their last complete scan (sqlite)"""
+
+    def __init__(self, db_path=DEVICE_REGISTRY_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._opened = False
+
+    def _connect(self):
+        if not self._opened:
+            self._opened = True
+            try:
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS devices ("
+                    " device_key TEXT PRIMARY KEY, mountpoint TEXT, device_type TEXT,"
+                    " first_seen TEXT, last_seen TEXT, signature_tag TEXT, files INTEGER, threats INTEGER)")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS manifest ("
+                    " device_key TEXT, path TEXT, size INTEGER, mtime_ns INTEGER,"
+                    " tier1 TEXT, sha256 TEXT, verdict TEXT,"
+                    " PRIMARY KEY (device_key, path))")
+                self._conn = conn
+            except sqlite3.Error as e:
+                log_message(f"Device registry unavailable ({self.db_path}): {e}", "ERROR")
+        return self._conn
+
+    def lookup(self, device_key):
+        """Return (device record or None, ScanManifest seeded with its last scan)"""
+        tag = signature_tag()
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None, ScanManifest(tag=tag)
+            try:
+                row = conn.execute(
+                    "SELECT mountpoint, device_type, first_seen, last_seen, signature_tag, files, threats"
+                    " FROM devices WHERE device_key = ?", (device_key,)).fetchone()
+                if row is None:
+                    return None, ScanManifest(tag=tag)
+                previous = {path: (size, mtime_ns, tier1, sha256, verdict)
+                            for path, size, mtime_ns, tier1, sha256, verdict in conn.execute(
+                                "SELECT path, size, mtime_ns, tier1, sha256, verdict FROM manifest"
+                                " WHERE device_key = ?", (device_key,))}
+            except sqlite3.Error as e:
+                log_message(f"Error reading device registry: {e}", "ERROR")
+                return None, ScanManifest(tag=tag)
+        device = dict(zip(('mountpoint', 'device_type', 'first_seen', 'last_seen',
+                           'signature_tag', 'files', 'threats'), row))
+        return device, ScanManifest(previous, device['signature_tag'] == tag, tag)
+
+    def save(self, device_key, mountpoint, device_type, manifest, threats):
+        """Replace the device's manifest with the one from a complete scan"""
+        now = datetime.now().isoformat()
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT INTO devices VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                        " ON CONFLICT(device_key) DO UPDATE SET mountpoint = excluded.mountpoint,"
+                        " device_type = excluded.device_type, last_seen = excluded.last_seen,"
+                        " signature_tag = excluded.signature_tag, files = excluded.files,"
+                        " threats = excluded.threats",
+                        (device_key, mountpoint, device_type, now, now, manifest.tag,
+                         len(manifest.entries), len(threats)))
+                    conn.execute("DELETE FROM manifest WHERE device_key = ?", (device_key,))
+                    conn.executemany(
+                        "INSERT INTO manifest VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        ((device_key, path) + entry for path, entry in manifest.entries.items()))
+            except sqlite3.Error as e:
+                log_message(f"Error updating device registry: {e}", "ERROR")
+
+def scan_registered_device(mountpoint, device_type, cancel=None, registry=None):
+    """Scan a device, re-evaluating only what changed since its last scan if it is registered"""
+    device_key = device_identity(mountpoint) if registry is not None else None
+    if device_key is None:
+        return scan_device_for_threats(mountpoint, device_type, cancel)
+    device, manifest = registry.lookup(device_key)
+    if device is not None:
+        log_message(f"   Known device {device_key} (last seen {device['last_seen']} at {device['mountpoint']}); "
+                    f"checking changes only", "INFO")
+    start = time.time()
+    threats = scan_device_for_threats(mountpoint, device_type, cancel, manifest)
+    if cancel is None or not cancel.is_set():
+        registry.save(device_key, mountpoint, device_type, manifest, threats)
+    log_message(f"   {device_key}: {len(manifest.entries)} files, {manifest.reused} unchanged, "
+                f"{manifest.evaluated} evaluated in {time.time() - start:.1f}s", "INFO")
+    return threats
 
 # ============================================================================
 # MONITORING
@@ -336,8 +830,275 @@ def log_threat(threat_data):
     except Exception as e:
         log_message(f"Error logging threat: {e}", "ERROR")
 
-def monitor_devices(interval=10):
-    """Monitor for new devices and scan them"""
+# ----------------------------------------------------------------------------
+# Hot-plug events
+# ----------------------------------------------------------------------------
+
+def parse_uevent(data):
+    """Parse a kernel uevent datagram ("ACTION@DEVPATH\0KEY=VALUE\0...") into a dict
+
+    Returns None for udev-daemon messages (libudev header) and malformed data.
+    """
+    if data.startswith(b'libudev\0'):
+        return None
+    parts = data.split(b'\0')
+    header = parts[0].decode('utf-8', 'replace')
+    if '@' not in header:
+        return None
+    action, _, devpath = header.partition('@')
+    event = {'ACTION': action, 'DEVPATH': devpath}
+    for part in parts[1:]:
+        key, sep, value = part.partition(b'=')
+        if sep:
+            event[key.decode('utf-8', 'replace')] = value.decode('utf-8', 'replace')
+    return event
+
+def is_storage_event(event):
+    """True for block device add/change/remove events"""
+    return event.get('SUBSYSTEM') == 'block' and event.get('ACTION') in ('add', 'change', 'remove')
+
+
+class UeventListener:
+    """Kernel hot-plug events from a NETLINK_KOBJECT_UEVENT socket.
+
+    Any datagram socket can be passed as sock (e.g. one end of a
+    socketpair) to feed synthetic events.
+    """
+
+    def __init__(self, sock=None):
+        if sock is None:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+            sock.bind((0, UEVENT_KERNEL_GROUP))
+        sock.setblocking(False)
+        self.sock = sock
+        self.overflows = 0
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def read_events(self):
+        """Return all queued events (never blocks)
+
+        Socket errors other than an overflow are raised; the listener is
+        unusable after them.
+        """
+        events = []
+        while True:
+            try:
+                data = self.sock.recv(UEVENT_BUFFER_SIZE)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                if e.errno != errno.ENOBUFS:
+                    raise
+                # The kernel dropped events; report it as a change
+                self.overflows += 1
+                events.append({'ACTION': 'overflow', 'SUBSYSTEM': 'block'})
+                continue
+            if not data:
+                break
+            event = parse_uevent(data)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def close(self):
+        self.sock.close()
+
+
+def wait_for_device_event(poller, listener, mount_file, timeout):
+    """Block until a storage uevent or mount table change, or timeout.
+
+    Returns 'uevent', 'mount' or 'timeout'. After a block device event it
+    waits up to UEVENT_SETTLE_SECONDS for the matching mount. If the uevent
+    socket fails, the listener is unregistered and closed and
+    'uevent-error' is returned.
+    """
+    deadline = time.monotonic() + timeout
+    reason = 'timeout'
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return reason
+        ready = poller.poll(remaining * 1000)
+        if not ready:
+            return reason
+        for fd, _ in ready:
+            if mount_file is not None and fd == mount_file.fileno():
+                # Re-reading mountinfo re-arms the poll notification
+                mount_file.seek(0)
+                mount_file.read()
+                return 'mount'
+            if listener is not None and fd == listener.fileno():
+                try:
+                    events = listener.read_events()
+                except OSError as e:
+                    # A persistent error would wake every poll at once
+                    log_message(f"uevent socket failed ({e}); relying on mount table changes "
+                                f"and polling", "WARNING")
+                    poller.unregister(fd)
+                    listener.close()
+                    return 'uevent-error'
+                storage = [event for event in events if is_storage_event(event)]
+                for event in storage:
+                    log_message(f"uevent: {event.get('ACTION')} {event.get('DEVNAME') or event.get('DEVPATH')}", "INFO")
+                if storage and reason == 'timeout':
+                    reason = 'uevent'
+                    deadline = min(deadline, time.monotonic() + UEVENT_SETTLE_SECONDS)
+
+def report_device_scan(mountpoint, device_type, threats):
+    """Log the result of one device scan"""
+    if threats:
+        log_message(f"   ⚠️  {len(threats)} THREATS DETECTED on {mountpoint} ({device_type})!", "WARNING")
+        for threat in threats:
+            log_threat(threat)
+            log_message(f"      THREAT: {threat['signature']} - {threat['description']} - Severity: {threat['severity']}", "WARNING")
+    else:
+        log_message(f"   ✅ No threats detected on {mountpoint} ({device_type})", "INFO")
+
+class DeviceScanPool:
+    """Identifies and scans devices on worker threads, off the detection loop.
+
+    Jobs wait in a FIFO per physical disk and are only handed to the
+    executor while that disk has fewer than per_block_device scans running,
+    so partitions of one phone never occupy workers another device could
+    use. cancel(device_id) drops a queued scan or stops a running one.
+    """
+
+    def __init__(self, workers=DEVICE_SCAN_WORKERS, per_block_device=SCANS_PER_BLOCK_DEVICE, registry=None):
+        self.registry = registry
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='device-scan')
+        self.workers = workers
+        self.per_block_device = per_block_device
+        self._queues = {}
+        self._running = {}
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, device_id, mountpoint):
+        """Queue identification and scan of a mounted device"""
+        cancel = threading.Event()
+        block_device = block_device_of(mountpoint) or mountpoint
+        with self._lock:
+            self._jobs[device_id] = cancel
+            self._queues.setdefault(block_device, collections.deque()).append((device_id, mountpoint, cancel))
+            self._dispatch_locked(block_device)
+
+    def _dispatch_locked(self, block_device):
+        """Start queued jobs for a disk while it has free slots (called with _lock held)"""
+        queue = self._queues.get(block_device)
+        while queue and self._running.get(block_device, 0) < self.per_block_device:
+            device_id, mountpoint, cancel = queue.popleft()
+            self._running[block_device] = self._running.get(block_device, 0) + 1
+            try:
+                self.executor.submit(self._run, device_id, mountpoint, block_device, cancel)
+            except RuntimeError:
+                # Pool shut down
+                self._running[block_device] -= 1
+                break
+        if not queue:
+            self._queues.pop(block_device, None)
+
+    def _run(self, device_id, mountpoint, block_device, cancel):
+        try:
+            if cancel.is_set():
+                return []
+            device_type = identify_device_type(mountpoint)
+            log_message(f"   Device type: {device_type} ({mountpoint})", "INFO")
+            threats = scan_registered_device(mountpoint, device_type, cancel, self.registry)
+            report_device_scan(mountpoint, device_type, threats)
+            return threats
+        except Exception as e:
+            log_message(f"Error scanning device {mountpoint}: {e}", "ERROR")
+            return []
+        finally:
+            with self._lock:
+                self._running[block_device] -= 1
+                if not self._running[block_device]:
+                    del self._running[block_device]
+                if self._jobs.get(device_id) is cancel:
+                    del self._jobs[device_id]
+                self._dispatch_locked(block_device)
+
+    def cancel(self, device_id):
+        """Stop the scan of a device that went away; True if one was pending"""
+        with self._lock:
+            cancel = self._jobs.get(device_id)
+            if cancel is None:
+                return False
+            cancel.set()
+            # A queued job is dropped outright
+            for block_device, queue in list(self._queues.items()):
+                remaining = collections.deque(job for job in queue if job[2] is not cancel)
+                if len(remaining) != len(queue):
+                    del self._jobs[device_id]
+                    if remaining:
+                        self._queues[block_device] = remaining
+                    else:
+                        del self._queues[block_device]
+        log_message(f"Cancelling scan of {device_id} (device removed)", "WARNING")
+        return True
+
+    def active(self):
+        """Device ids with a queued or running scan"""
+        with self._lock:
+            return list(self._jobs)
+
+    def shutdown(self):
+        with self._lock:
+            pending = list(self._jobs.values())
+            self._queues.clear()
+        for cancel in pending:
+            cancel.set()
+        self.executor.shutdown(wait=False)
+
+def check_devices(known_devices, pool=None, registry=None):
+    """Detect devices once, identifying and scanning any not seen before.
+
+    With a DeviceScanPool the scans run in the background and the call
+    returns at once. Devices that have gone away are forgotten (and their
+    scans cancelled), so plugging one back in scans it again.
+    """
+    devices = detect_usb_devices()
+    present = set()
+    
+    # Check for new devices
+    for device in devices:
+        device_id = device.get('mountpoint') or device.get('name') or device.get('usb_id')
+        if not device_id:
+            continue
+        present.add(device_id)
+        
+        if device_id not in known_devices:
+            log_message(f"🔍 NEW DEVICE DETECTED: {device_id}", "WARNING")
+            log_device(device)
+            known_devices.add(device_id)
+            
+            mountpoint = device.get('mountpoint')
+            if not mountpoint:
+                continue
+            if pool is not None:
+                pool.submit(device_id, mountpoint)
+            else:
+                # Identify device type and scan for threats
+                device_type = identify_device_type(mountpoint)
+                log_message(f"   Device type: {device_type}", "INFO")
+                report_device_scan(mountpoint, device_type,
+                                   scan_registered_device(mountpoint, device_type, registry=registry))
+    
+    if pool is not None:
+        for device_id in known_devices - present:
+            pool.cancel(device_id)
+    known_devices &= present
+
+def monitor_devices(interval=10, events=False, registry=None):
+    """Monitor for new devices and scan them
+
+    With events=True the monitor wakes on kernel uevents and mount table
+    changes as well as every interval seconds. With a DeviceRegistry,
+    devices seen before (also before a restart, or at another mountpoint)
+    only have their changed files evaluated.
+    """
     log_message("══════════════════════════════════════════════════════════════", "INFO")
     log_message("CROSS-DEVICE SCANNER - DEVICE MONITORING", "INFO")
     log_message("══════════════════════════════════════════════════════════════", "INFO")
@@ -345,51 +1106,95 @@ def monitor_devices(interval=10):
     log_message("", "INFO")
     
     known_devices = set()
+    pool = DeviceScanPool(registry=registry)
+    log_message(f"Scan workers: {pool.workers} ({pool.per_block_device} per block device)", "INFO")
+    listener = None
+    mount_file = None
+    poller = None
+    if events:
+        poller = select.poll()
+        try:
+            listener = UeventListener()
+            poller.register(listener.fileno(), select.POLLIN)
+        except OSError as e:
+            log_message(f"uevent socket unavailable ({e}); relying on mount table changes and polling", "WARNING")
+        try:
+            mount_file = open(MOUNTINFO, 'r')
+            mount_file.read()
+            poller.register(mount_file.fileno(), select.POLLPRI | select.POLLERR)
+        except OSError as e:
+            log_message(f"Cannot watch {MOUNTINFO} ({e})", "WARNING")
+            mount_file = None
+        log_message(f"Event mode: uevents {'on' if listener else 'off'}, "
+                    f"mount watch {'on' if mount_file else 'off'}, polling every {interval}s", "INFO")
     
     while True:
         try:
-            # Detect devices
-            devices = detect_usb_devices()
-            
-            # Check for new devices
-            for device in devices:
-                device_id = device.get('mountpoint') or device.get('name') or device.get('usb_id')
-                
-                if device_id and device_id not in known_devices:
-                    log_message(f"🔍 NEW DEVICE DETECTED: {device_id}", "WARNING")
-                    log_device(device)
-                    known_devices.add(device_id)
-                    
-                    # Identify device type
-                    mountpoint = device.get('mountpoint')
-                    if mountpoint:
-                        device_type = identify_device_type(mountpoint)
-                        log_message(f"   Device type: {device_type}", "INFO")
-                        
-                        # Scan for threats
-                        threats = scan_device_for_threats(mountpoint, device_type)
-                        
-                        if threats:
-                            log_message(f"   ⚠️  {len(threats)} THREATS DETECTED!", "WARNING")
-                            for threat in threats:
-                                log_threat(threat)
-                                log_message(f"      THREAT: {threat['signature']} - {threat['description']} - Severity: {threat['severity']}", "WARNING")
-                        else:
-                            log_message(f"   ✅ No threats detected", "INFO")
-            
-            time.sleep(interval)
+            check_devices(known_devices, pool)
+            if poller is None:
+                time.sleep(interval)
+            else:
+                reason = wait_for_device_event(poller, listener, mount_file, interval)
+                if reason == 'uevent-error':
+                    listener = None
+                elif reason != 'timeout':
+                    log_message(f"Device change ({reason}); checking devices", "INFO")
         except KeyboardInterrupt:
             log_message("DEVICE MONITORING STOPPED BY USER", "INFO")
+            pool.shutdown()
             break
         except Exception as e:
             log_message(f"Error in device monitoring: {e}", "ERROR")
             time.sleep(interval)
 
+# ============================================================================
+# DIAGNOSTICS
+# ============================================================================
+
+def uevent_selftest():
+    """Diagnostic: feed synthetic uevents through a socketpair and check parsing and wake-ups
+
+    Not used by scanning or monitoring; run it with --uevent-selftest.
+    """
+    ours, theirs = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    listener = UeventListener(sock=ours)
+    poller = select.poll()
+    poller.register(listener.fileno(), select.POLLIN)
+    results = {}
+    
+    def uevent(action, devpath, **fields):
+        body = ''.join(f"{key}={value}\0" for key, value in dict(ACTION=action, DEVPATH=devpath, **fields).items())
+        return f"{action}@{devpath}\0{body}".encode()
+    
+    partition = uevent('add', '/devices/pci0000:00/usb1/1-1/1-1:1.0/host6/block/sdb/sdb1',
+                       SUBSYSTEM='block', DEVNAME='sdb1', DEVTYPE='partition', SEQNUM='4242')
+    theirs.send(partition)
+    event = listener.read_events()[0]
+    results['parse'] = event == {
+        'ACTION': 'add', 'DEVPATH': '/devices/pci0000:00/usb1/1-1/1-1:1.0/host6/block/sdb/sdb1',
+        'SUBSYSTEM': 'block', 'DEVNAME': 'sdb1', 'DEVTYPE': 'partition', 'SEQNUM': '4242'}
+    
+    theirs.send(b'libudev\0' + b'\0' * 32 + partition)
+    results['ignores_udev_messages'] = listener.read_events() == []
+    
+    theirs.send(uevent('add', '/devices/pci0000:00/usb1/1-1', SUBSYSTEM='usb', DEVTYPE='usb_device'))
+    results['ignores_non_block'] = wait_for_device_event(poller, listener, None, 0.2) == 'timeout'
+    
+    theirs.send(partition)
+    start = time.monotonic()
+    reason = wait_for_device_event(poller, listener, None, 5)
+    results['wakes_on_block_add'] = reason == 'uevent' and time.monotonic() - start <= UEVENT_SETTLE_SECONDS + 0.5
+    
+    listener.close()
+    theirs.close()
+    return results
+
 # ============================================================================
 # MAIN
 # ============================================================================
 
 def main():
+    global FULL_HASH_POLICY
     import argparse
     
     parser = argparse.ArgumentParser(description='CROSS-DEVICE SCANNER - Detects threats on phone/Xbox/MP3 player')
@@ -397,10 +1202,27 @@ def main():
     parser.add_argument('--monitor', action='store_true', help='Monitor for new devices')
     parser.add_argument('--interval', type=int, default=10, help='Monitor interval in seconds (default: 10)')
     parser.add_argument('--daemon', action='store_true', help='Run as daemon')
+    parser.add_argument('--events', action='store_true',
+                        help='With --monitor: react to hot-plug uevents and mounts immediately (polling stays as fallback)')
+    parser.add_argument('--uevent-selftest', action='store_true',
+                        help='Diagnostic only: check uevent parsing and wake-ups with synthetic events '
+                             'over a socketpair, then exit')
+    parser.add_argument('--no-registry', action='store_true',
+                        help=f'Scan every file, ignoring the device registry ({DEVICE_REGISTRY_DB})')
+    parser.add_argument('--full-hash', action='store_true',
+                        help=f'SHA256 every file up to {FULL_HASH_MAX_BYTES // (1024 * 1024)} MB, '
+                             'not only tier-1 fingerprint hits')
     
     args = parser.parse_args()
+    if args.full_hash:
+        FULL_HASH_POLICY = 'always'
+    registry = None if args.no_registry else DeviceRegistry()
     
-    if args.monitor:
+    if args.uevent_selftest:
+        results = uevent_selftest()
+        print(json.dumps(results, indent=2))
+        sys.exit(0 if all(results.values()) else 1)
+    elif args.monitor:
         if args.daemon:
             # Fork to background
             pid = os.fork()
@@ -416,9 +1238,9 @@ def main():
             else:
                 # Child - run scanner
                 os.setsid()
-                monitor_devices(args.interval)
+                monitor_devices(args.interval, args.events, registry)
         else:
-            monitor_devices(args.interval)
+            monitor_devices(args.interval, args.events, registry)
     elif args.scan:
         log_message("Running single scan of all devices...", "INFO")
         devices = detect_usb_devices()
@@ -429,7 +1251,7 @@ def main():
             mountpoint = device.get('mountpoint')
             if mountpoint:
                 device_type = identify_device_type(mountpoint)
-                threats = scan_device_for_threats(mountpoint, device_type)
+                threats = scan_registered_device(mountpoint, device_type, registry=registry)
                 all_threats.extend(threats)
                 log_message(f"Scanned {mountpoint}: {len(threats)} threats", "INFO")
         
@@ -437,7 +1259,7 @@ def main():
         print(f"📄 Threat log: {THREAT_LOG}")
     else:
         # Default: monitor
-        monitor_devices(args.interval)
+        monitor_devices(args.interval, registry=registry)
 
 if __name__ == '__main__':
     main()
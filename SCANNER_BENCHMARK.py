@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+SCANNER BENCHMARK - Reproducible performance runs for the file and process scanners
+Builds deterministic synthetic trees and process fixtures, times each
+scanner in a fresh child process and compares against a stored baseline
+
+Scanners:
+    radar_files       SIGNATURE_RADAR.scan_file_signatures
+    radar_removable   SIGNATURE_RADAR.scan_removable_device
+    radar_processes   SIGNATURE_RADAR.scan_process_signatures (process fixtures)
+    cross_device      CROSS_DEVICE_SCANNER.scan_device_for_threats
+    file_watcher      FILE_WATCHER_SWARM_AGENT.FileWatcherAgent._scan
+
+Throughput is reported against the synthetic tree: files/s is files in the
+tree per second and MB/s is tree bytes per second, so scanners that read
+more or less of each file stay comparable. Trees are scanned with a warm
+page cache (they were just written or read by the previous scanner).
+
+For: Anthony Eric Chavez - The Keeper
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import resource
+import subprocess
+import tempfile
+from datetime import datetime
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+BENCHMARK_DIR = "/tmp/scanner_benchmark"
+RESULTS_FILE = "/tmp/scanner_benchmark_results.json"
+BASELINE_FILE = "/tmp/scanner_benchmark_baseline.json"
+
+# A scanner regresses when files/s drops by more than MAX_SLOWDOWN or peak
+# RSS grows by more than MAX_RSS_GROWTH relative to the baseline
+MAX_SLOWDOWN = 0.20
+MAX_RSS_GROWTH = 0.25
+
+SCANNERS = ['radar_files', 'radar_removable', 'radar_processes', 'cross_device', 'file_watcher']
+
+# Size mix: (share of files, min bytes, max bytes)
+SIZE_MIX = [
+    (0.80, 512, 16 * 1024),
+    (0.18, 16 * 1024, 256 * 1024),
+    (0.02, 1024 * 1024, 2 * 1024 * 1024)
+]
+
+PROFILES = {
+    'small': {'files': 2000, 'depth': 3, 'fanout': 4, 'match_share': 0.05, 'processes': 50},
+    'medium': {'files': 20000, 'depth': 4, 'fanout': 5, 'match_share': 0.05, 'processes': 200},
+    'large': {'files': 100000, 'depth': 5, 'fanout': 6, 'match_share': 0.02, 'processes': 500}
+}
+
+# Planted names that hit the filename signatures of the scanners
+MATCHING_NAMES = ['autorun.inf', 'payload.exe', 'setup.apk', 'run.sh', '.hidden_cfg',
+                  'firmware.bin', 'launch.ini', 'photo.jpg.lnk']
+CLEAN_EXTENSIONS = ['.mp3', '.jpg', '.txt', '.dat', '.pdf']
+# Process fixtures run /bin/sleep under these argv[0] names
+MATCHING_PROCESS_NAMES = ['keylogger-sim', 'cryptominer-sim', 'backdoor-sim']
+CLEAN_PROCESS_NAMES = ['worker-sim', 'indexer-sim']
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+def tree_params(files, depth, fanout, match_share, seed, size_mix=None):
+    """Tree parameters in JSON form, so they compare equal to a stored manifest"""
+    return json.loads(json.dumps({
+        'files': files,
+        'depth': depth,
+        'fanout': fanout,
+        'match_share': match_share,
+        'seed': seed,
+        'size_mix': size_mix or SIZE_MIX
+    }))
+
+def generate_tree(root, params):
+    """Create (or reuse) a deterministic synthetic tree; returns its manifest.
+
+    Files are spread round-robin over a directory tree `depth` levels deep
+    with `fanout` subdirectories per level. A share of match_share files
+    get names from MATCHING_NAMES; sizes follow size_mix and contents are
+    slices of one seeded random block.
+    """
+    manifest_path = os.path.join(root, '.benchmark_manifest.json')
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('params') == params:
+            return manifest
+    except (OSError, ValueError):
+        pass
+
+    if os.path.exists(root):
+        import shutil
+        shutil.rmtree(root)
+    os.makedirs(root)
+
+    rng = random.Random(params['seed'])
+    block = rng.randbytes(4 * 1024 * 1024)
+
+    directories = ['']
+    level = ['']
+    for _ in range(params['depth']):
+        level = [os.path.join(parent, f"dir_{i:02d}") for parent in level for i in range(params['fanout'])]
+        directories.extend(level)
+    for directory in directories:
+        os.makedirs(os.path.join(root, directory), exist_ok=True)
+
+    shares = [share for share, _, _ in params['size_mix']]
+    total_bytes = 0
+    matching = 0
+    for i in range(params['files']):
+        directory = directories[i % len(directories)]
+        if rng.random() < params['match_share']:
+            base = rng.choice(MATCHING_NAMES)
+            # Keep dot files dot files
+            name = f"{base}_{i:06d}" if base.startswith('.') else f"{i:06d}_{base}"
+            matching += 1
+        else:
+            name = f"file_{i:06d}{rng.choice(CLEAN_EXTENSIONS)}"
+        _, low, high = rng.choices(params['size_mix'], weights=shares)[0]
+        size = rng.randint(low, high)
+        offset = rng.randrange(0, len(block) - min(size, len(block)) + 1)
+        with open(os.path.join(root, directory, name), 'wb') as f:
+            remaining = size
+            while remaining > 0:
+                chunk = block[offset:offset + remaining]
+                f.write(chunk)
+                remaining -= len(chunk)
+                offset = 0
+        total_bytes += size
+
+    manifest = {
+        'params': params,
+        'directories': len(directories),
+        'files': params['files'],
+        'bytes': total_bytes,
+        'matching_files': matching,
+        'created': datetime.now().isoformat()
+    }
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def start_process_fixtures(count, match_share, seed, lifetime=600):
+    """Start `count` sleeping processes with seeded argv[0] names; returns the Popen list"""
+    rng = random.Random(seed)
+    procs = []
+    for i in range(count):
+        names = MATCHING_PROCESS_NAMES if rng.random() < match_share else CLEAN_PROCESS_NAMES
+        procs.append(subprocess.Popen([rng.choice(names), str(lifetime)], executable='/bin/sleep',
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+    return procs
+
+def stop_process_fixtures(procs):
+    for proc in procs:
+        proc.kill()
+    for proc in procs:
+        proc.wait()
+
+# ============================================================================
+# SCANNER RUNS (CHILD PROCESS)
+# ============================================================================
+
+def _isolate_radar(workdir):
+    """Import SIGNATURE_RADAR with its logs and caches redirected into workdir"""
+    import SIGNATURE_RADAR as radar
+    radar.RADAR_LOG = os.path.join(workdir, 'radar.log')
+    radar.THREAT_LOG = os.path.join(workdir, 'threats.log')
+    radar.SCAN_CACHE = radar.ScanCache(db_path=os.path.join(workdir, 'cache.sqlite'))
+    radar.FILE_SCAN_MAX_FILES_PER_ROOT = None
+    radar.FILE_SCAN_MAX_SECONDS_PER_ROOT = None
+    radar.refresh_signatures()
+    return radar
+
+def run_scanner(scanner, root, workdir):
+    """Run one scanner once over root; returns (threats found, items scanned)"""
+    if scanner == 'radar_files':
+        radar = _isolate_radar(workdir)
+        threats = radar.scan_file_signatures(max_depth=64, scan_dirs=[root])
+        items = radar.SCAN_COUNTERS.get('cache_reevaluated') + radar.SCAN_COUNTERS.get('cache_hits')
+    elif scanner == 'radar_removable':
+        radar = _isolate_radar(workdir)
+        threats = radar.scan_removable_device(root)
+        items = radar.SCAN_COUNTERS.get('cache_reevaluated') + radar.SCAN_COUNTERS.get('cache_hits')
+        radar.get_hash_pool().shutdown()
+    elif scanner == 'radar_processes':
+        radar = _isolate_radar(workdir)
+        threats = radar.scan_process_signatures()
+        items = radar.SCAN_COUNTERS.get('process_evaluated') + radar.SCAN_COUNTERS.get('process_cache_hits')
+    elif scanner == 'cross_device':
+        import CROSS_DEVICE_SCANNER as cross_device
+        cross_device.SCANNER_LOG = os.path.join(workdir, 'cross_device.log')
+        threats = cross_device.scan_device_for_threats(root, 'usb')
+        items = None
+    elif scanner == 'file_watcher':
+        from FILE_WATCHER_SWARM_AGENT import FileWatcherAgent, FileWatcherConfig
+        config = FileWatcherConfig()
+        config.roots = [root]
+        config.snapshot_path = os.path.join(workdir, 'snapshot.json')
+        config.log_path = os.path.join(workdir, 'changes.log')
+        snapshot = FileWatcherAgent(config)._scan()
+        threats, items = [], len(snapshot)
+    else:
+        raise ValueError(f"unknown scanner {scanner}")
+    return threats, items
+
+def run_one(scanner, root):
+    """Child-process entry point: time one scanner and report JSON on stdout"""
+    with tempfile.TemporaryDirectory(prefix='scanner_benchmark_') as workdir:
+        base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        threats, items = run_scanner(scanner, root, workdir)
+        seconds = time.perf_counter() - start
+        cpu_seconds = time.process_time() - cpu_start
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Write out radar logs while workdir still exists
+        if 'SIGNATURE_RADAR' in sys.modules:
+            sys.modules['SIGNATURE_RADAR'].flush_journals()
+    digest = hashlib.sha256(json.dumps(
+        sorted(f"{t.get('signature')}:{os.path.basename(str(t.get('file', t.get('name', ''))))}"
+               for t in threats)).encode()).hexdigest()[:16]
+    print(json.dumps({
+        'seconds': seconds,
+        'cpu_seconds': cpu_seconds,
+        'threats': len(threats),
+        'threat_digest': digest,
+        'items': items,
+        'base_rss_kb': base_rss,
+        'peak_rss_kb': peak_rss
+    }))
+
+# ============================================================================
+# BENCHMARK DRIVER
+# ============================================================================
+
+def benchmark(scanners, manifest, root, repeat=3, process_count=0):
+    """Run each scanner `repeat` times in fresh children; keeps the fastest run"""
+    results = {}
+    for scanner in scanners:
+        runs = []
+        for _ in range(repeat):
+            child = subprocess.run([sys.executable, os.path.abspath(__file__), '--run-one', scanner, '--root', root],
+                                   capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+            if child.returncode != 0:
+                results[scanner] = {'error': child.stderr.strip().splitlines()[-1:] or ['failed']}
+                break
+            runs.append(json.loads(child.stdout.strip().splitlines()[-1]))
+        if not runs:
+            continue
+        best = min(runs, key=lambda run: run['seconds'])
+        if scanner == 'radar_processes':
+            units = best['items'] or process_count
+            result = {'processes': units, 'processes_per_second': round(units / best['seconds'], 1)}
+        else:
+            result = {
+                'files': manifest['files'],
+                'files_per_second': round(manifest['files'] / best['seconds'], 1),
+                'mb_per_second': round(manifest['bytes'] / (1024 * 1024) / best['seconds'], 1)
+            }
+        result.update({
+            'seconds': round(best['seconds'], 3),
+            'cpu_seconds': round(best['cpu_seconds'], 3),
+            'seconds_all_runs': [round(run['seconds'], 3) for run in runs],
+            'threats': best['threats'],
+            'threat_digest': best['threat_digest'],
+            'peak_rss_mb': round(best['peak_rss_kb'] / 1024, 1),
+            'scan_rss_mb': round((best['peak_rss_kb'] - best['base_rss_kb']) / 1024, 1)
+        })
+        results[scanner] = result
+        print(f"   {scanner:16s} {result['seconds']:8.3f}s  {result.get('files_per_second', result.get('processes_per_second')):>10} /s"
+              f"  {result.get('mb_per_second', '-'):>8} MB/s  peak RSS {result['peak_rss_mb']} MB"
+              f"  threats {result['threats']}")
+    return results
+
+def compare(results, baseline, max_slowdown=MAX_SLOWDOWN, max_rss_growth=MAX_RSS_GROWTH):
+    """Compare results with a baseline; returns (regressions, notes)"""
+    regressions = []
+    notes = []
+    if baseline.get('params') != results.get('params'):
+        notes.append('baseline was recorded with different tree parameters')
+    for scanner, result in results['scanners'].items():
+        base = baseline.get('scanners', {}).get(scanner)
+        if base is None or 'error' in base or 'error' in result:
+            continue
+        rate_key = 'processes_per_second' if scanner == 'radar_processes' else 'files_per_second'
+        if base.get(rate_key) and result[rate_key] < base[rate_key] * (1 - max_slowdown):
+            regressions.append(f"{scanner}: {rate_key} {result[rate_key]} < baseline {base[rate_key]} "
+                               f"(-{(1 - result[rate_key] / base[rate_key]) * 100:.0f}%)")
+        if base.get('peak_rss_mb') and result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + max_rss_growth):
+            regressions.append(f"{scanner}: peak RSS {result['peak_rss_mb']} MB > baseline {base['peak_rss_mb']} MB")
+        if base.get('threat_digest') != result['threat_digest'] and scanner != 'radar_processes':
+            notes.append(f"{scanner}: threats changed ({base.get('threats')} -> {result['threats']})")
+    return regressions, notes
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='SCANNER BENCHMARK - Reproducible scanner performance runs')
+    parser.add_argument('--profile', choices=list(PROFILES), default='small', help='Tree size profile (default: small)')
+    parser.add_argument('--files', type=int, help='Override: number of files in the tree')
+    parser.add_argument('--depth', type=int, help='Override: directory depth')
+    parser.add_argument('--fanout', type=int, help='Override: subdirectories per directory')
+    parser.add_argument('--match-share', type=float, help='Override: share of files/processes with matching names')
+    parser.add_argument('--processes', type=int, help='Override: number of process fixtures')
+    parser.add_argument('--seed', type=int, default=1337, help='Fixture seed (default: 1337)')
+    parser.add_argument('--scanners', nargs='+', choices=SCANNERS, default=SCANNERS, help='Scanners to run')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per scanner; the fastest is kept (default: 3)')
+    parser.add_argument('--root', default=None, help=f'Tree location (default: {BENCHMARK_DIR}/<profile>)')
+    parser.add_argument('--output', default=RESULTS_FILE, help=f'Results JSON (default: {RESULTS_FILE})')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help=f'Baseline JSON (default: {BASELINE_FILE})')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--max-slowdown', type=float, default=MAX_SLOWDOWN,
+                        help=f'Allowed files/s drop vs baseline (default: {MAX_SLOWDOWN})')
+    parser.add_argument('--max-rss-growth', type=float, default=MAX_RSS_GROWTH,
+                        help=f'Allowed peak RSS growth vs baseline (default: {MAX_RSS_GROWTH})')
+    parser.add_argument('--run-one', metavar='SCANNER', help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.run_one:
+        run_one(args.run_one, args.root)
+        return 0
+
+    profile = dict(PROFILES[args.profile])
+    for key in ('files', 'depth', 'fanout', 'match_share', 'processes'):
+        if getattr(args, key) is not None:
+            profile[key] = getattr(args, key)
+    params = tree_params(profile['files'], profile['depth'], profile['fanout'], profile['match_share'], args.seed)
+    root = args.root or os.path.join(BENCHMARK_DIR, args.profile)
+
+    print(f"Preparing tree {root} ({profile['files']} files, depth {profile['depth']})...")
+    start = time.perf_counter()
+    manifest = generate_tree(root, params)
+    print(f"   {manifest['files']} files, {manifest['bytes'] / (1024 * 1024):.1f} MB, "
+          f"{manifest['matching_files']} matching names ({time.perf_counter() - start:.1f}s)")
+
+    fixtures = []
+    if 'radar_processes' in args.scanners:
+        fixtures = start_process_fixtures(profile['processes'], profile['match_share'], args.seed)
+    try:
+        print("Running scanners...")
+        scanners = benchmark(args.scanners, manifest, root, args.repeat, len(fixtures))
+    finally:
+        stop_process_fixtures(fixtures)
+
+    results = {
+        'created': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'cpus': os.cpu_count(),
+        'profile': args.profile,
+        'params': dict(params, processes=profile['processes']),
+        'tree': {key: manifest[key] for key in ('files', 'bytes', 'directories', 'matching_files')},
+        'scanners': scanners
+    }
+
+    exit_code = 0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions, notes = compare(results, baseline, args.max_slowdown, args.max_rss_growth)
+        results['comparison'] = {'baseline': args.baseline, 'regressions': regressions, 'notes': notes}
+        for note in notes:
+            print(f"   note: {note}")
+        for regression in regressions:
+            print(f"   ❌ REGRESSION: {regression}")
+        if regressions:
+            exit_code = 1
+        else:
+            print("   ✅ Within baseline thresholds")
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"📄 Results: {args.output}")
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"📄 Baseline saved: {args.baseline}")
+    return exit_code
+
+if __name__ == '__main__':
+    sys.exit(main())
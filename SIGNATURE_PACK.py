@@ -0,0 +1,556 @@
+#!/usr/bin/env python3
+"""
+SIGNATURE PACK - Compiled on-disk signatures for SIGNATURE RADAR and CROSS-DEVICE SCANNER
+One versioned file holds precompiled pattern tables, a sorted binary hash
+table that is searched straight from mmap, and metadata. Scanners load it
+in milliseconds and swap in a new pack while running.
+
+For: Anthony Eric Chavez - The Keeper
+
+Layout (little endian):
+    header   MAGIC, format version (u32), section count (u32)
+    sections count x (name 16s, offset u64, length u64), then the section data
+
+Sections:
+    meta          JSON: pack_version, created, digest, hash_count, sources
+    radar         JSON: CROSS_PLATFORM_SIGNATURES and compiled matcher tables
+    content       JSON: content (byte) signatures
+    cross_device  JSON: CROSS_DEVICE_SIGNATURES
+    sha256        sorted raw 32-byte SHA256 digests, 8-byte aligned
+    tier1         sorted raw 16-byte tier-1 fingerprints (see tier1_fingerprint)
+    sha256.idx    bucket index for sha256: 65537 u32, entry b = number of
+    tier1.idx     keys whose first two bytes are below b (same for tier1)
+
+Hash tables are built with an external merge sort, so feeds with tens of
+millions of digests need only BUILD_RUN_KEYS keys in memory; readers map
+the file and touch only the pages a lookup needs, shared between processes.
+"""
+
+import os
+import json
+import mmap
+import time
+import heapq
+import itertools
+import struct
+import hashlib
+import tempfile
+import threading
+from datetime import datetime
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SIGNATURE_PACK_PATH = "/tmp/signature_radar.pack"
+MAGIC = b'SIGPACK\x00'
+FORMAT_VERSION = 1
+# Minimum seconds between stat() checks for a new pack
+PACK_RECHECK_INTERVAL = 1.0
+
+_HEADER = struct.Struct('<8sII')
+_SECTION = struct.Struct('<16sQQ')
+DIGEST_SIZE = 32
+# Keys per sorted run when building (32 MB of SHA256 digests)
+BUILD_RUN_KEYS = 1 << 20
+# Hash table bucket index on the first two key bytes
+INDEX_BUCKETS = 1 << 16
+_INDEX_ENTRY = struct.Struct('<II')
+
+# Tier-1 fingerprint: blake2b over size, head, tail and evenly spaced middle
+# samples. Changing any of these invalidates existing packs, so bump
+# TIER1_VERSION with them.
+TIER1_VERSION = 1
+TIER1_DIGEST_SIZE = 16
+TIER1_HEAD_BYTES = 64 * 1024
+TIER1_TAIL_BYTES = 64 * 1024
+TIER1_SAMPLES = 4
+TIER1_SAMPLE_BYTES = 16 * 1024
+
+# ============================================================================
+# FINGERPRINTS
+# ============================================================================
+
+def tier1_fingerprint(path, size=None):
+    """Cheap fingerprint of a file: at most about 200 KB is read, whatever its size.
+
+    Returns the hex blake2b key, or None if the file cannot be read. Files
+    smaller than the sampled regions are hashed whole.
+    """
+    try:
+        with open(path, 'rb') as f:
+            if size is None:
+                size = os.fstat(f.fileno()).st_size
+            h = hashlib.blake2b(struct.pack('<Q', size), digest_size=TIER1_DIGEST_SIZE)
+            sampled = TIER1_HEAD_BYTES + TIER1_TAIL_BYTES + TIER1_SAMPLES * TIER1_SAMPLE_BYTES
+            if size <= sampled:
+                h.update(f.read(sampled))
+                return h.hexdigest()
+            h.update(f.read(TIER1_HEAD_BYTES))
+            middle = size - TIER1_HEAD_BYTES - TIER1_TAIL_BYTES - TIER1_SAMPLE_BYTES
+            for i in range(1, TIER1_SAMPLES + 1):
+                f.seek(TIER1_HEAD_BYTES + middle * i // (TIER1_SAMPLES + 1))
+                h.update(f.read(TIER1_SAMPLE_BYTES))
+            f.seek(size - TIER1_TAIL_BYTES)
+            h.update(f.read(TIER1_TAIL_BYTES))
+            return h.hexdigest()
+    except OSError:
+        return None
+
+def sha256_file(path, chunk_size=1024 * 1024):
+    """Full streaming SHA256 of a file (hex), or None if it cannot be read"""
+    try:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                h.update(chunk)
+        return h.hexdigest()
+    except OSError:
+        return None
+
+# ============================================================================
+# READING
+# ============================================================================
+
+class PackError(Exception):
+    """Raised for a missing, truncated or incompatible pack"""
+
+
+class SignaturePack:
+    """A loaded pack: section table over one read-only mmap.
+
+    JSON sections are decoded on first use; the hash table is never copied
+    and is binary-searched in place.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            self.identity = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+            if st.st_size < _HEADER.size:
+                raise PackError(f"{path}: truncated header")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise PackError(f"{path}: not a signature pack")
+        if version != FORMAT_VERSION:
+            raise PackError(f"{path}: unsupported pack format {version}")
+        self.sections = {}
+        for i in range(count):
+            raw_name, offset, length = _SECTION.unpack_from(self._mm, _HEADER.size + i * _SECTION.size)
+            if offset + length > len(self._mm):
+                raise PackError(f"{path}: section {raw_name!r} out of bounds")
+            self.sections[raw_name.rstrip(b'\x00').decode()] = (offset, length)
+        self._json = {}
+        self._lock = threading.Lock()
+        self.meta = self.section_json('meta') or {}
+        offset, length = self.sections.get('sha256', (0, 0))
+        self._hash_offset = offset
+        self.hash_count = length // DIGEST_SIZE
+        self._hash_index = self._index_offset('sha256.idx')
+        offset, length = self.sections.get('tier1', (0, 0))
+        if self.meta.get('tier1_version', TIER1_VERSION) != TIER1_VERSION:
+            # Fingerprints from another scheme would never match
+            length = 0
+        self._tier1_offset = offset
+        self.tier1_count = length // TIER1_DIGEST_SIZE
+        self._tier1_index = self._index_offset('tier1.idx')
+
+    def _index_offset(self, name):
+        """Offset of a bucket index section, or None (older packs: plain binary search)"""
+        offset, length = self.sections.get(name, (0, 0))
+        return offset if length == (INDEX_BUCKETS + 1) * 4 else None
+
+    @property
+    def version(self):
+        return self.meta.get('pack_version')
+
+    @property
+    def digest(self):
+        return self.meta.get('digest')
+
+    def section_bytes(self, name):
+        """Return a memoryview of a section, or None"""
+        if name not in self.sections:
+            return None
+        offset, length = self.sections[name]
+        return memoryview(self._mm)[offset:offset + length]
+
+    def section_json(self, name):
+        """Decode (once) and return a JSON section, or None"""
+        with self._lock:
+            if name not in self._json:
+                if name not in self.sections:
+                    return None
+                offset, length = self.sections[name]
+                self._json[name] = json.loads(self._mm[offset:offset + length])
+            return self._json[name]
+
+    def _search(self, base, count, size, key, index=None):
+        if isinstance(key, str):
+            try:
+                key = bytes.fromhex(key)
+            except ValueError:
+                return False
+        else:
+            key = bytes(key)
+        if len(key) != size:
+            return False
+        mm = self._mm
+        if index is None:
+            lo, hi = 0, count
+        else:
+            # Narrow to the keys sharing the first two bytes
+            lo, hi = _INDEX_ENTRY.unpack_from(mm, index + ((key[0] << 8) | key[1]) * 4)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = base + mid * size
+            entry = mm[start:start + size]
+            if entry < key:
+                lo = mid + 1
+            elif entry > key:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def contains_hash(self, file_hash):
+        """True if the hex (or raw) SHA256 digest is in the hash table"""
+        if not file_hash or not self.hash_count:
+            return False
+        return self._search(self._hash_offset, self.hash_count, DIGEST_SIZE, file_hash, self._hash_index)
+
+    def contains_tier1(self, key):
+        """True if the hex (or raw) tier-1 fingerprint is in the pack"""
+        if not key or not self.tier1_count:
+            return False
+        return self._search(self._tier1_offset, self.tier1_count, TIER1_DIGEST_SIZE, key, self._tier1_index)
+
+
+class PackWatcher:
+    """Holds the current pack for a path and swaps in new ones.
+
+    current() stats the path at most every recheck_interval seconds; when
+    the file has been replaced it loads the new pack and swaps the
+    reference in one assignment, so readers see either the old or the new
+    pack, never a mix. Packs should be replaced with os.replace (as
+    write_pack does) so the old mapping stays valid for readers holding it.
+    A pack that fails to load leaves the previous one in place.
+    """
+
+    def __init__(self, path=SIGNATURE_PACK_PATH, recheck_interval=PACK_RECHECK_INTERVAL, log=None):
+        self.path = path
+        self.recheck_interval = recheck_interval
+        self.log = log
+        self.generation = 0
+        self._pack = None
+        self._identity = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _log(self, message, level="INFO"):
+        if self.log is not None:
+            self.log(message, level)
+
+    def current(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return self._pack
+        with self._lock:
+            if now < self._next_check:
+                return self._pack
+            self._next_check = now + self.recheck_interval
+            try:
+                st = os.stat(self.path)
+                identity = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+            except OSError:
+                identity = None
+            if identity == self._identity:
+                return self._pack
+            self._identity = identity
+            if identity is None:
+                if self._pack is not None:
+                    self._log(f"Signature pack {self.path} removed; using built-in signatures", "WARNING")
+                    self._pack = None
+                    self.generation += 1
+                return None
+            try:
+                start = time.perf_counter()
+                pack = SignaturePack(self.path)
+            except (OSError, ValueError, PackError) as e:
+                self._log(f"Error loading signature pack {self.path}: {e}", "ERROR")
+                return self._pack
+            self._pack = pack
+            self.generation += 1
+            self._log(f"Signature pack {self.path} loaded: version {pack.version}, "
+                      f"{pack.hash_count} hashes in {(time.perf_counter() - start) * 1000:.1f} ms", "INFO")
+            return pack
+
+# ============================================================================
+# WRITING
+# ============================================================================
+
+def _json_bytes(data):
+    return json.dumps(data, sort_keys=True, separators=(',', ':')).encode()
+
+def _sorted_runs(keys, size, tmp_dir):
+    """Sort hex keys into runs of BUILD_RUN_KEYS raw keys in temp files.
+
+    Invalid entries are skipped. Returns the run file paths.
+    """
+    runs = []
+    chunk = []
+
+    def flush():
+        chunk.sort()
+        fd, run_path = tempfile.mkstemp(prefix='.sigpack-run-', dir=tmp_dir)
+        runs.append(run_path)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b''.join(chunk))
+        chunk.clear()
+
+    try:
+        for key in keys:
+            try:
+                raw = bytes.fromhex(key.strip())
+            except (AttributeError, ValueError):
+                continue
+            if len(raw) == size:
+                chunk.append(raw)
+                if len(chunk) >= BUILD_RUN_KEYS:
+                    flush()
+        if chunk:
+            flush()
+    except BaseException:
+        _remove_files(runs)
+        raise
+    return runs
+
+def _read_run(path, size, block_keys=65536):
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(size * block_keys)
+            if not block:
+                return
+            for i in range(0, len(block), size):
+                yield block[i:i + size]
+
+def _remove_files(paths):
+    for path in paths:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+def _write_table(f, runs, size, digest, block_keys=65536):
+    """Merge sorted runs into f, dropping duplicates.
+
+    Returns (key count, bucket index bytes).
+    """
+    buckets = [0] * INDEX_BUCKETS
+    count = 0
+    previous = None
+    block = []
+    for key in heapq.merge(*(_read_run(path, size) for path in runs)):
+        if key == previous:
+            continue
+        previous = key
+        block.append(key)
+        buckets[(key[0] << 8) | key[1]] += 1
+        if len(block) >= block_keys:
+            data = b''.join(block)
+            f.write(data)
+            digest.update(data)
+            count += len(block)
+            block = []
+    if block:
+        data = b''.join(block)
+        f.write(data)
+        digest.update(data)
+        count += len(block)
+    cumulative = [0]
+    for n in buckets:
+        cumulative.append(cumulative[-1] + n)
+    return count, struct.pack(f'<{INDEX_BUCKETS + 1}I', *cumulative)
+
+def write_pack(path, sections, hashes=(), pack_version=None, sources=None, tier1=()):
+    """Write a pack atomically (temp file + os.replace).
+
+    sections maps section names to JSON-serializable data; hashes is an
+    iterable of hex SHA256 strings and tier1 of hex tier-1 fingerprints
+    (invalid entries are skipped). Both are streamed through an external
+    sort next to the pack. Returns the pack metadata.
+    """
+    tmp_dir = os.path.dirname(os.path.abspath(path))
+    payloads = [(name, _json_bytes(data)) for name, data in sorted(sections.items())]
+    tables = [('sha256', DIGEST_SIZE, hashes), ('tier1', TIER1_DIGEST_SIZE, tier1)]
+    names = ['meta'] + [name for name, _ in payloads] + [name for name, _, _ in tables] + \
+            [name + '.idx' for name, _, _ in tables]
+
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    runs = {}
+    try:
+        for name, size, keys in tables:
+            runs[name] = _sorted_runs(keys, size, tmp_dir)
+        with open(tmp_path, 'wb') as f:
+            # Section table is written last, once every offset is known
+            f.write(b'\x00' * (_HEADER.size + _SECTION.size * len(names)))
+            index = {}
+
+            def begin():
+                # Keep every section 8-byte aligned
+                f.write(b'\x00' * (-f.tell() % 8))
+                return f.tell()
+
+            content_digest = hashlib.sha256()
+            for name, payload in payloads:
+                start = begin()
+                f.write(payload)
+                index[name] = (start, len(payload))
+                content_digest.update(name.encode() + b'\x00' + payload)
+            counts = {}
+            bucket_index = {}
+            for name, size, _ in tables:
+                start = begin()
+                content_digest.update(name.encode() + b'\x00')
+                counts[name], bucket_index[name] = _write_table(f, runs[name], size, content_digest)
+                index[name] = (start, counts[name] * size)
+            for name, _, _ in tables:
+                start = begin()
+                f.write(bucket_index[name])
+                index[name + '.idx'] = (start, len(bucket_index[name]))
+
+            meta = {
+                'pack_version': pack_version if pack_version is not None else int(time.time()),
+                'created': datetime.now().isoformat(),
+                'digest': content_digest.hexdigest(),
+                'hash_count': counts['sha256'],
+                'tier1_count': counts['tier1'],
+                'tier1_version': TIER1_VERSION,
+                'sections': names[1:],
+                'sources': sources or []
+            }
+            payload = _json_bytes(meta)
+            start = begin()
+            f.write(payload)
+            index['meta'] = (start, len(payload))
+
+            f.seek(0)
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(names)))
+            f.writelines(_SECTION.pack(name.encode(), *index[name]) for name in names)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        _remove_files([tmp_path])
+        raise
+    finally:
+        for paths in runs.values():
+            _remove_files(paths)
+    return meta
+
+def read_hash_sources(paths):
+    """Yield hex digests from JSON signature DBs (known_threat_hashes) or text files (one per line)"""
+    for path in paths:
+        with open(path, 'r') as f:
+            if path.endswith('.json'):
+                for h in json.load(f).get('known_threat_hashes', []):
+                    if isinstance(h, str):
+                        yield h
+            else:
+                for line in f:
+                    line = line.split('#', 1)[0].strip()
+                    if line:
+                        yield line
+
+def fingerprint_samples(paths):
+    """Return (sha256 list, tier-1 list) for every file under the sample paths"""
+    hashes, fingerprints = [], []
+    for top in paths:
+        if os.path.isfile(top):
+            files = [top]
+        else:
+            files = [os.path.join(root, name) for root, _, names in os.walk(top) for name in names]
+        for path in files:
+            file_hash = sha256_file(path)
+            key = tier1_fingerprint(path)
+            if file_hash and key:
+                hashes.append(file_hash)
+                fingerprints.append(key)
+    return hashes, fingerprints
+
+def build_pack(path=SIGNATURE_PACK_PATH, hash_sources=(), content_pack=None, pack_version=None, samples=()):
+    """Compile the scanners' signatures (plus hash feeds and sample files) into a pack
+
+    Hash feeds only carry SHA256 digests; sample files add both the SHA256
+    and the tier-1 fingerprint, so large samples are found without a full read.
+    """
+    import SIGNATURE_RADAR
+    import CROSS_DEVICE_SCANNER
+
+    content = dict(SIGNATURE_RADAR.CONTENT_SIGNATURES)
+    if content_pack:
+        with open(content_pack, 'r') as f:
+            content.update(json.load(f))
+    sections = {
+        'radar': {
+            'signatures': SIGNATURE_RADAR.CROSS_PLATFORM_SIGNATURES,
+            'matchers': {
+                'removable': SIGNATURE_RADAR.REMOVABLE_MATCHER.to_tables(),
+                'file': SIGNATURE_RADAR.FILE_MATCHER.to_tables(),
+                'process': SIGNATURE_RADAR.PROCESS_MATCHER.to_tables()
+            }
+        },
+        'content': content,
+        'cross_device': {
+            'signatures': CROSS_DEVICE_SCANNER.compile_signatures(CROSS_DEVICE_SCANNER.CROSS_DEVICE_SIGNATURES)
+        }
+    }
+    sources = [os.path.abspath(p) for p in hash_sources]
+    if content_pack:
+        sources.append(os.path.abspath(content_pack))
+    sample_hashes, fingerprints = fingerprint_samples(samples)
+    sources.extend(os.path.abspath(p) for p in samples)
+    hashes = itertools.chain(read_hash_sources(hash_sources), sample_hashes)
+    return write_pack(path, sections, hashes, pack_version, sources, fingerprints)
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='SIGNATURE PACK - Build and inspect compiled signature packs '
+                                                 '(prints pack metadata by default)')
+    parser.add_argument('--build', action='store_true', help='Compile the built-in signatures and hash feeds into a pack')
+    parser.add_argument('--pack', default=SIGNATURE_PACK_PATH, help=f'Pack path (default: {SIGNATURE_PACK_PATH})')
+    parser.add_argument('--hashes', nargs='*', default=[], metavar='FILE',
+                        help='Hash feeds: JSON signature DBs or text files with one SHA256 per line')
+    parser.add_argument('--samples', nargs='*', default=[], metavar='PATH',
+                        help='Known-bad sample files or directories (adds SHA256 and tier-1 fingerprints)')
+    parser.add_argument('--content', metavar='FILE', help='Extra content signatures (JSON, as CONTENT_SIGNATURE_PACK)')
+    parser.add_argument('--pack-version', type=int, help='Pack version (default: current Unix time)')
+    parser.add_argument('--lookup', metavar='SHA256', help='Check whether a hash is in the pack')
+
+    args = parser.parse_args()
+
+    if args.build:
+        start = time.perf_counter()
+        meta = build_pack(args.pack, args.hashes, args.content, args.pack_version, args.samples)
+        print(f"✅ Signature pack written: {args.pack} (version {meta['pack_version']}, "
+              f"{meta['hash_count']} hashes, {meta['tier1_count']} tier-1 fingerprints, "
+              f"{time.perf_counter() - start:.2f}s)")
+    elif args.lookup:
+        pack = SignaturePack(args.pack)
+        print('known' if pack.contains_hash(args.lookup) else 'not found')
+    else:
+        start = time.perf_counter()
+        pack = SignaturePack(args.pack)
+        info = dict(pack.meta, load_ms=round((time.perf_counter() - start) * 1000, 2),
+                    section_bytes={name: length for name, (_, length) in pack.sections.items()})
+        print(json.dumps(info, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -22,10 +22,28 @@ import sys
 import hashlib
 import subprocess
 import threading
+import concurrent.futures
+import mmap
+import ctypes
+import ctypes.util
+import errno
+import stat
+import select
+import struct
+import socket
+import atexit
+import gzip
+import shutil
+import sqlite3
+import socketserver
+import http.server
 from datetime import datetime
 from pathlib import Path
 import re
 
+from SIGNATURE_PACK import PackWatcher
+from CROSS_DEVICE_SCANNER import block_device_of
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -34,6 +52,130 @@ RADAR_LOG = "/tmp/signature_radar.log"
 THREAT_LOG = "/tmp/signature_radar_threats.log"
 SIGNATURE_DB = "/tmp/signature_radar_db.json"
 STATUS_FILE = "/tmp/signature_radar_status.json"
+# Compiled signature pack (see SIGNATURE_PACK.py); when present it replaces
+# the built-in signature tables and adds its hash table to SIGNATURE_DB
+SIGNATURE_PACK_PATH = "/tmp/signature_radar.pack"
+
+# Known-hash index: feeds larger than this get a Bloom filter in front of a
+# compact sorted digest table instead of a plain set of hex strings
+SIGNATURE_INDEX_BLOOM_THRESHOLD = 100000
+SIGNATURE_INDEX_BLOOM_BITS_PER_ENTRY = 12
+SIGNATURE_INDEX_BLOOM_PROBES = 4
+# Minimum seconds between mtime checks of SIGNATURE_DB
+SIGNATURE_INDEX_RECHECK_INTERVAL = 1.0
+
+# File hashing: files are streamed through a reused per-thread buffer of
+# HASH_CHUNK_SIZE bytes; files larger than HASH_MAX_BYTES are not hashed
+HASH_CHUNK_SIZE = 1024 * 1024
+HASH_MAX_BYTES = 512 * 1024 * 1024
+HASH_USE_MMAP = False
+# Removable-device hashing runs on a worker pool ('thread' or 'process');
+# files queued or being hashed may not add up to more than
+# HASH_MAX_INFLIGHT_BYTES (a single larger file is still let through alone)
+HASH_WORKERS = min(8, os.cpu_count() or 1)
+HASH_POOL_KIND = 'thread'
+HASH_MAX_INFLIGHT_BYTES = 256 * 1024 * 1024
+
+# Content signatures: byte patterns searched for inside files, so renamed
+# payloads are still caught. Packs in CONTENT_SIGNATURE_PACK add to the
+# built-in CONTENT_SIGNATURES; at most CONTENT_SCAN_MAX_BYTES of each file
+# are searched. Up to CONTENT_FIND_MAX_PATTERNS needles are matched with one
+# bytes.find each, larger sets with a single compiled alternation
+CONTENT_SIGNATURE_PACK = "/tmp/signature_radar_content.json"
+CONTENT_SCAN_ENABLED = True
+CONTENT_SCAN_MAX_BYTES = 8 * 1024 * 1024
+CONTENT_FIND_MAX_PATTERNS = 128
+
+# Incremental scans: last verdict and hash per (st_dev, st_ino), reused while
+# size and mtime_ns are unchanged
+SCAN_CACHE_DB = "/tmp/signature_radar_cache.sqlite"
+# Entries not seen for this many cycles are dropped
+SCAN_CACHE_PRUNE_CYCLES = 20
+
+# Resource governor: token buckets for bytes read and files stat'ed per
+# second and a target share of one CPU (0 = unlimited). While the 1-minute
+# load average per CPU is above GOVERNOR_LOAD_HIGH, budgets shrink in
+# proportion down to 1 / GOVERNOR_MAX_BACKOFF; with no CPU share set,
+# GOVERNOR_LOAD_CPU_SHARE applies while the load is high, so the backoff
+# works out of the box (0 disables it). GOVERNOR_IO_IDLE moves the radar
+# into the idle I/O scheduling class
+GOVERNOR_MAX_BYTES_PER_SECOND = 0
+GOVERNOR_MAX_FILES_PER_SECOND = 0
+GOVERNOR_CPU_SHARE = 0
+GOVERNOR_CPU_WINDOW = 5.0
+GOVERNOR_LOAD_HIGH = 1.0
+GOVERNOR_LOAD_CPU_SHARE = 0.5
+GOVERNOR_LOAD_INTERVAL = 1.0
+GOVERNOR_MAX_BACKOFF = 8.0
+GOVERNOR_IO_IDLE = False
+
+# radar_scan phases run concurrently on a bounded pool; each phase stops
+# once its deadline (seconds from cycle start) has passed. The deadlines
+# and grace below are for a RADAR_PHASE_BASE_INTERVAL monitor interval and
+# scale with the actual one. A phase still running when the next cycle
+# starts is waited for up to the grace period, then skipped for that cycle.
+RADAR_PHASE_WORKERS = 4
+RADAR_PHASE_BASE_INTERVAL = 30
+RADAR_PHASE_DEADLINES = {
+    'processes': 20,
+    'removable_devices': 25,
+    'network': 20,
+    'critical_files': 25
+}
+# Extra seconds to wait for a phase past its deadline before reporting it as overrun
+RADAR_PHASE_GRACE = 5
+# One-shot scans (no monitor interval) have no next cycle to make room for,
+# so their phases run to completion unless this is set (seconds)
+RADAR_ONESHOT_DEADLINE = None
+# Removable devices are scanned concurrently, one worker per underlying
+# block device (partitions of one disk are scanned one after another)
+REMOVABLE_SCAN_WORKERS = 4
+
+# Common threat locations swept by scan_file_signatures (and watched in event mode)
+FILE_SCAN_DIRS = [
+    '/tmp', '/var/tmp', '/dev/shm',
+    '/home', '/root', '/opt',
+    '/media', '/mnt', '/run/media'
+]
+# Depth of the critical-file sweep in radar_scan
+CRITICAL_FILE_DEPTH = 2
+# Per-root limits for the critical-file sweep (None = unlimited); a root that
+# hits one is reported as truncated in the status file
+FILE_SCAN_MAX_FILES_PER_ROOT = 200000
+FILE_SCAN_MAX_SECONDS_PER_ROOT = 20
+# Directory name prefixes never descended into
+FILE_SCAN_EXCLUDE = ()
+REMOVABLE_SCAN_EXCLUDE = ('.Trash', 'System Volume Information', '$RECYCLE')
+# Network phase reads /proc/net/{tcp,tcp6,udp,udp6} directly when available
+PROC_NET_DIR = "/proc/net"
+
+# Open threats across cycles; only new / escalated / resolved transitions
+# are written to the threat log
+THREAT_STATE_DB = "/tmp/signature_radar_state.sqlite"
+
+# Log and threat journals: lines are batched and written by a background
+# thread; files rotate at JOURNAL_MAX_BYTES keeping JOURNAL_BACKUPS old
+# segments (gzipped if JOURNAL_COMPRESS). JOURNAL_FSYNC is 'never', 'batch'
+# (fsync after each written batch) or 'always' (write and fsync every line)
+JOURNAL_MAX_BYTES = 50 * 1024 * 1024
+JOURNAL_BACKUPS = 5
+JOURNAL_COMPRESS = True
+JOURNAL_FSYNC = 'batch'
+JOURNAL_FLUSH_INTERVAL = 0.5
+JOURNAL_MAX_BATCH = 5000
+
+# Optional metrics endpoint in Prometheus text format: 'host:port' or
+# 'unix:/path' (None = disabled)
+METRICS_ADDRESS = None
+METRICS_DURATION_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+# Event mode: full rescan safety net, and how long to collect events before
+# evaluating them: changes are evaluated once no event arrived for
+# EVENT_BATCH_SECONDS, or at the latest EVENT_MAX_BATCH_AGE seconds after
+# the oldest pending change (so a busy directory cannot postpone them)
+EVENT_FULL_RESCAN_INTERVAL = 300
+EVENT_BATCH_SECONDS = 0.2
+EVENT_MAX_BATCH_AGE = 1.0
 
 # ============================================================================
 # THREAT SIGNATURES - Cross-Platform Detection
@@ -170,6 +312,757 @@ DEVICE_SIGNATURES = {
     }
 }
 
+# Byte signatures matched against file contents. Patterns are kept hex
+# encoded so this file (and the pack) do not match themselves
+CONTENT_SIGNATURES = {
+    'eicar_test_file': {
+        'patterns_hex': [
+            '58354f2150254041505b345c505a58353428505e2937434329377d2445494341522d'
+            '5354414e444152442d414e544956495255532d544553542d46494c452124482b482a'
+        ],
+        'description': 'EICAR anti-malware test file',
+        'severity': 'HIGH'
+    },
+    'reverse_shell': {
+        'patterns_hex': ['62617368202d69203e26202f6465762f7463702f', '6e63202d65202f62696e2f7368'],
+        'description': 'Embedded reverse shell command',
+        'severity': 'CRITICAL'
+    },
+    'crypto_miner_pool': {
+        'patterns_hex': ['7374726174756d2b7463703a2f2f', '7374726174756d2b73736c3a2f2f'],
+        'description': 'Mining pool URL - Cryptominer payload',
+        'severity': 'HIGH'
+    },
+    'credential_dumper': {
+        'patterns_hex': ['73656b75726c73613a3a6c6f676f6e70617373776f726473', '696e766f6b652d6d696d696b61747a'],
+        'nocase': True,
+        'description': 'Credential dumping tool (mimikatz)',
+        'severity': 'CRITICAL'
+    },
+    'encoded_powershell': {
+        'patterns_hex': ['706f7765727368656c6c202d656e63', '2d656e636f646564636f6d6d616e6420'],
+        'nocase': True,
+        'description': 'Encoded PowerShell launcher',
+        'severity': 'HIGH'
+    },
+    'meterpreter_payload': {
+        'patterns_hex': ['5265666c6563746976654c6f61646572', '6d65747372762e646c6c'],
+        'description': 'Meterpreter / reflective DLL payload',
+        'severity': 'CRITICAL'
+    }
+}
+
+# ============================================================================
+# SIGNATURE COMPILER
+# ============================================================================
+
+def _literal_form(pattern):
+    """Reduce a simple regex to (kind, [lowercase literals]) or None.
+
+    kind is 'substring', 'prefix', 'suffix' or 'exact'. Handles escapes,
+    case-pair classes like [Aa] and a trailing (a|b|c) literal group, which
+    covers most of CROSS_PLATFORM_SIGNATURES; anything else stays a regex.
+    """
+    anchored_start = pattern.startswith('^')
+    anchored_end = pattern.endswith('$') and not pattern.endswith('\\$')
+    body = pattern[1 if anchored_start else 0:len(pattern) - 1 if anchored_end else len(pattern)]
+
+    prefix = []
+    alternatives = ['']
+    i = 0
+    while i < len(body):
+        c = body[i]
+        if c == '\\' and i + 1 < len(body) and not body[i + 1].isalnum():
+            prefix.append(body[i + 1])
+            i += 2
+        elif c == '[' and i + 3 < len(body) and body[i + 3] == ']' and \
+                body[i + 1].lower() == body[i + 2].lower() and body[i + 1].isalpha():
+            prefix.append(body[i + 1])
+            i += 4
+        elif c == '(' and body.endswith(')') and i == body.index('('):
+            options = body[i + 1:-1].split('|')
+            if not all(re.fullmatch(r'[A-Za-z0-9_]+', o) for o in options):
+                return None
+            alternatives = options
+            break
+        elif c.isalnum() or c in '_-~ ':
+            prefix.append(c)
+            i += 1
+        else:
+            return None
+
+    literals = [(''.join(prefix) + alt).lower() for alt in alternatives]
+    if not all(literals):
+        return None
+    kind = {(False, False): 'substring', (True, False): 'prefix',
+            (False, True): 'suffix', (True, True): 'exact'}[(anchored_start, anchored_end)]
+    return kind, literals
+
+
+def _regex_guard(pattern):
+    """Return (required leading literal, minimum match length) for a regex.
+
+    Cheap pre-checks that let the matcher skip a regex fallback outright:
+    'xbox.*exploit' cannot match a name without 'xbox', and '[0-9]{10,}'
+    cannot match a name shorter than 10 characters.
+    """
+    if '|' in pattern:
+        return '', 0
+    leading = re.match(r'(?:[A-Za-z0-9_]|\\[^A-Za-z0-9])+', pattern)
+    guard = ''
+    if leading and not re.match(r'[*?{+]', pattern[leading.end():leading.end() + 1]):
+        guard = re.sub(r'\\(.)', r'\1', leading.group(0)).lower()
+    repeat = re.fullmatch(r'\^?\[[^\]]+\]\{(\d+)(?:,\d*)?\}.*', pattern)
+    min_length = int(repeat.group(1)) if repeat else 0
+    return guard, min_length
+
+
+class SignatureMatcher:
+    """Compiled filename matcher for a subset of CROSS_PLATFORM_SIGNATURES.
+
+    Patterns that are really literals (extensions, keywords, anchored
+    prefixes) become table lookups and substring tests; the rest are
+    compiled once as regex fallbacks. One pass over a name yields the set
+    of matching patterns, and attribution matches the original loop: the
+    first pattern in list order for every matching signature.
+    """
+
+    def __init__(self, signatures, select=None):
+        self.entries = []
+        self.extensions = {}
+        self.suffixes = []
+        self.prefixes = []
+        self.substrings = []
+        self.exact = {}
+        self.regexes = []
+        pattern_id = 0
+        for sig_name, sig_data in signatures.items():
+            if select is not None and not select(sig_name):
+                continue
+            ids = []
+            for pattern in sig_data['patterns']:
+                ids.append((pattern_id, pattern))
+                self._add(pattern_id, pattern)
+                pattern_id += 1
+            if ids:
+                self.entries.append((sig_name, sig_data, ids))
+
+    def to_tables(self):
+        """Return the compiled lookup tables as JSON-serializable data"""
+        return {
+            'entries': [[sig_name, ids] for sig_name, _, ids in self.entries],
+            'extensions': self.extensions,
+            'suffixes': self.suffixes,
+            'prefixes': self.prefixes,
+            'substrings': self.substrings,
+            'exact': self.exact,
+            'regexes': [[pattern_id, regex.pattern, guard, min_length]
+                        for pattern_id, regex, guard, min_length in self.regexes]
+        }
+
+    @classmethod
+    def from_tables(cls, signatures, tables):
+        """Rebuild a matcher from to_tables() output without re-analysing patterns"""
+        matcher = cls({})
+        matcher.entries = [(sig_name, signatures[sig_name], [tuple(i) for i in ids])
+                           for sig_name, ids in tables['entries']]
+        matcher.extensions = tables['extensions']
+        matcher.suffixes = [tuple(item) for item in tables['suffixes']]
+        matcher.prefixes = [tuple(item) for item in tables['prefixes']]
+        matcher.substrings = [tuple(item) for item in tables['substrings']]
+        matcher.exact = tables['exact']
+        matcher.regexes = [(pattern_id, re.compile(pattern, re.IGNORECASE), guard, min_length)
+                           for pattern_id, pattern, guard, min_length in tables['regexes']]
+        return matcher
+
+    def _add(self, pattern_id, pattern):
+        form = _literal_form(pattern)
+        if form is None:
+            guard, min_length = _regex_guard(pattern)
+            self.regexes.append((pattern_id, re.compile(pattern, re.IGNORECASE), guard, min_length))
+            return
+        kind, literals = form
+        for literal in literals:
+            if kind == 'suffix' and literal.startswith('.') and '.' not in literal[1:]:
+                self.extensions.setdefault(literal[1:], []).append(pattern_id)
+            elif kind == 'suffix':
+                self.suffixes.append((literal, pattern_id))
+            elif kind == 'prefix':
+                self.prefixes.append((literal, pattern_id))
+            elif kind == 'exact':
+                self.exact.setdefault(literal, []).append(pattern_id)
+            else:
+                self.substrings.append((literal, pattern_id))
+
+    def matched_ids(self, name):
+        """Return the set of pattern ids matching name"""
+        lname = name.lower()
+        found = set()
+        _, dot, ext = lname.rpartition('.')
+        if dot and ext in self.extensions:
+            found.update(self.extensions[ext])
+        if lname in self.exact:
+            found.update(self.exact[lname])
+        for literal, pattern_id in self.suffixes:
+            if lname.endswith(literal):
+                found.add(pattern_id)
+        for literal, pattern_id in self.prefixes:
+            if lname.startswith(literal):
+                found.add(pattern_id)
+        for literal, pattern_id in self.substrings:
+            if literal in lname:
+                found.add(pattern_id)
+        length = len(lname)
+        for pattern_id, regex, guard, min_length in self.regexes:
+            if length < min_length or (guard and guard not in lname):
+                continue
+            if regex.search(name):
+                found.add(pattern_id)
+        return found
+
+    def match(self, name, *more):
+        """Return [(sig_name, sig_data, pattern)] for every signature matching any of the names"""
+        found = self.matched_ids(name)
+        for other in more:
+            found |= self.matched_ids(other)
+        if not found:
+            return []
+        hits = []
+        for sig_name, sig_data, ids in self.entries:
+            for pattern_id, pattern in ids:
+                if pattern_id in found:
+                    hits.append((sig_name, sig_data, pattern))
+                    break
+        return hits
+
+
+# Removable devices are checked against every signature; the critical-file
+# sweep only against the file and USB signatures
+REMOVABLE_MATCHER = SignatureMatcher(CROSS_PLATFORM_SIGNATURES)
+FILE_MATCHER = SignatureMatcher(
+    CROSS_PLATFORM_SIGNATURES, select=lambda sig_name: 'file' in sig_name or 'usb' in sig_name)
+PROCESS_MATCHER = SignatureMatcher(
+    CROSS_PLATFORM_SIGNATURES, select=lambda sig_name: 'process' in sig_name or 'behavioral' in sig_name)
+
+# Signature pack currently applied to the matchers (None = built-in tables)
+SIGNATURE_PACK = PackWatcher(SIGNATURE_PACK_PATH, log=lambda message, level: log_message(message, level))
+_applied_pack_generation = None
+
+_signature_tag = None
+
+def _apply_signature_tag(content_digest=None):
+    """Tag cached verdicts with the pattern signatures and the content signatures in use"""
+    if _signature_tag is None:
+        return
+    if content_digest is None:
+        content_digest = CONTENT_MATCHER.digest()
+    SCAN_CACHE.set_signature_tag(f"{_signature_tag}+content:{content_digest}")
+
+def _builtin_signature_tag():
+    return 'builtin:' + hashlib.sha256(json.dumps(
+        [CROSS_PLATFORM_SIGNATURES, CONTENT_SIGNATURES], sort_keys=True).encode()).hexdigest()[:16]
+
+def refresh_signatures():
+    """Swap in a new signature pack if one was installed; returns True on a swap.
+
+    Matchers are rebound in one assignment each, and cached verdicts are
+    dropped since they were computed with the old signatures.
+    """
+    global REMOVABLE_MATCHER, FILE_MATCHER, PROCESS_MATCHER, _applied_pack_generation, _signature_tag
+    pack = SIGNATURE_PACK.current()
+    if SIGNATURE_PACK.generation == _applied_pack_generation:
+        return False
+    _applied_pack_generation = SIGNATURE_PACK.generation
+    radar = pack.section_json('radar') if pack is not None else None
+    try:
+        if radar is not None:
+            signatures, tables = radar['signatures'], radar['matchers']
+            matchers = (SignatureMatcher.from_tables(signatures, tables['removable']),
+                        SignatureMatcher.from_tables(signatures, tables['file']),
+                        SignatureMatcher.from_tables(signatures, tables['process']))
+            tag = f"pack:{pack.version}:{pack.digest}"
+        else:
+            matchers = (SignatureMatcher(CROSS_PLATFORM_SIGNATURES),
+                        SignatureMatcher(CROSS_PLATFORM_SIGNATURES,
+                                         select=lambda sig_name: 'file' in sig_name or 'usb' in sig_name),
+                        SignatureMatcher(CROSS_PLATFORM_SIGNATURES,
+                                         select=lambda sig_name: 'process' in sig_name or 'behavioral' in sig_name))
+            tag = _builtin_signature_tag()
+    except (KeyError, TypeError, ValueError, re.error) as e:
+        log_message(f"Signature pack {SIGNATURE_PACK.path} has unusable pattern tables: {e}", "ERROR")
+        return False
+    REMOVABLE_MATCHER, FILE_MATCHER, PROCESS_MATCHER = matchers
+    content = pack.section_json('content') if pack is not None else None
+    CONTENT_MATCHER.set_base_signatures(CONTENT_SIGNATURES if content is None else content)
+    _signature_tag = tag
+    _apply_signature_tag()
+    PROCESS_VERDICTS.clear()
+    log_message(f"Signatures in use: {tag}", "INFO")
+    return True
+
+def signature_pack_status():
+    """Describe the signature source for the status file"""
+    pack = SIGNATURE_PACK.current()
+    if pack is None:
+        return {'source': 'builtin', 'path': SIGNATURE_PACK_PATH}
+    return {
+        'source': 'pack',
+        'path': pack.path,
+        'version': pack.version,
+        'created': pack.meta.get('created'),
+        'hash_count': pack.hash_count,
+        'digest': pack.digest
+    }
+
+def _legacy_match(name, select=None):
+    """Original per-pattern loop, kept as the benchmark baseline"""
+    hits = []
+    for sig_name, sig_data in CROSS_PLATFORM_SIGNATURES.items():
+        if select is not None and not select(sig_name):
+            continue
+        for pattern in sig_data['patterns']:
+            if re.search(pattern, name, re.IGNORECASE):
+                hits.append((sig_name, sig_data, pattern))
+                break
+    return hits
+
+def benchmark_signature_matcher(count=1000000, seed=1337):
+    """Compare SignatureMatcher against the per-pattern loop on synthetic names"""
+    import random
+    rng = random.Random(seed)
+    stems = ['report', 'photo', 'IMG_2024', 'song', 'notes', 'backup', 'setup',
+             'readme', 'data', 'invoice', 'track01', 'video', 'thumbs', 'index']
+    exts = ['.jpg', '.mp3', '.txt', '.pdf', '.png', '.doc', '.mp4', '.zip',
+            '.sh', '.py', '.exe', '.apk', '.so', '.lnk', '.ini', '.log']
+    alphabet = 'abcdefghijklmnopqrstuvwxyz0123456789'
+    names = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.02:
+            name = ''.join(rng.choice(alphabet) for _ in range(36))
+        elif roll < 0.04:
+            name = '.' + rng.choice(stems)
+        else:
+            name = f"{rng.choice(stems)}_{i % 9973}{rng.choice(exts)}"
+        names.append(name.lower())
+
+    results = {'names': count}
+    for label, fn in [('legacy', _legacy_match), ('compiled', REMOVABLE_MATCHER.match)]:
+        start = time.perf_counter()
+        hits = 0
+        for name in names:
+            hits += len(fn(name))
+        elapsed = time.perf_counter() - start
+        results[label] = {
+            'seconds': round(elapsed, 3),
+            'names_per_second': int(count / elapsed) if elapsed > 0 else 0,
+            'hits': hits
+        }
+
+    # Attribution must be identical, not just the totals
+    sample = names[::max(1, count // 20000)]
+    results['attribution_identical'] = all(
+        [(h[0], h[2]) for h in _legacy_match(n)] == [(h[0], h[2]) for h in REMOVABLE_MATCHER.match(n)]
+        for n in sample)
+    if results['compiled']['seconds'] > 0:
+        results['speedup'] = round(results['legacy']['seconds'] / results['compiled']['seconds'], 2)
+    return results
+
+# ============================================================================
+# INCREMENTAL SCAN CACHE
+# ============================================================================
+
+class ScanCache:
+    """Persistent per-file verdict cache keyed on (scope, st_dev, st_ino, path).
+
+    An entry is reused only while size and mtime_ns still match, so
+    rewritten or replaced files are always re-evaluated; the path is part of
+    the key because name signatures depend on it (renames, hard links). The
+    table is loaded into memory once; new verdicts are written back in one
+    transaction at the end of each cycle.
+    """
+
+    def __init__(self, db_path=SCAN_CACHE_DB, prune_cycles=SCAN_CACHE_PRUNE_CYCLES):
+        self.db_path = db_path
+        self.prune_cycles = prune_cycles
+        self._lock = threading.Lock()
+        self._conn = None
+        self._entries = None
+        self._dirty = {}
+        self._cycle = 0
+        self._signature_tag = None
+
+    def _open(self):
+        self._entries = {}
+        try:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS scan_cache_meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS scan_cache ("
+                " scope TEXT, dev INTEGER, ino INTEGER, path TEXT, size INTEGER,"
+                " mtime_ns INTEGER, file_hash TEXT, verdict TEXT,"
+                " PRIMARY KEY (scope, dev, ino, path))")
+            for row in self._conn.execute(
+                    "SELECT scope, dev, ino, path, size, mtime_ns, file_hash, verdict FROM scan_cache"):
+                scope, dev, ino, path, size, mtime_ns, file_hash, verdict = row
+                self._entries[(scope, dev, ino, path)] = [size, mtime_ns, file_hash, verdict, self._cycle]
+        except sqlite3.Error as e:
+            log_message(f"Scan cache unavailable ({self.db_path}): {e}", "ERROR")
+            self._conn = None
+
+    def set_signature_tag(self, tag):
+        """Drop every cached verdict if they were computed with other signatures"""
+        with self._lock:
+            if self._entries is None:
+                self._open()
+            if self._conn is None:
+                if self._signature_tag not in (None, tag):
+                    self._entries, self._dirty = {}, {}
+                self._signature_tag = tag
+                return
+            try:
+                row = self._conn.execute(
+                    "SELECT value FROM scan_cache_meta WHERE key = 'signatures'").fetchone()
+                if row is not None and row[0] == tag:
+                    return
+                with self._conn:
+                    if row is not None:
+                        self._conn.execute("DELETE FROM scan_cache")
+                        self._entries, self._dirty = {}, {}
+                        log_message("Signatures changed; scan cache cleared", "INFO")
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO scan_cache_meta VALUES ('signatures', ?)", (tag,))
+            except sqlite3.Error as e:
+                log_message(f"Error updating scan cache: {e}", "ERROR")
+
+    def begin_cycle(self):
+        with self._lock:
+            if self._entries is None:
+                self._open()
+            self._cycle += 1
+
+    def lookup(self, scope, file_path):
+        """Return (stat, (verdict, file_hash) or None); stat is None if unreadable"""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None, None
+        key = (scope, st.st_dev, st.st_ino, file_path)
+        with self._lock:
+            if self._entries is None:
+                self._open()
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+                entry[4] = self._cycle
+                SCAN_COUNTERS.add('cache_hits')
+                return st, (json.loads(entry[3]), entry[2])
+        return st, None
+
+    def store(self, scope, file_path, st, verdict, file_hash):
+        """Record a fresh verdict for a file stat'ed by lookup()"""
+        SCAN_COUNTERS.add('cache_reevaluated')
+        if st is None:
+            return
+        key = (scope, st.st_dev, st.st_ino, file_path)
+        with self._lock:
+            entry = [st.st_size, st.st_mtime_ns, file_hash, json.dumps(verdict), self._cycle]
+            self._entries[key] = entry
+            self._dirty[key] = entry
+
+    def evaluate(self, scope, file_path, evaluate):
+        """Return (verdict, file_hash) from cache, or call evaluate() and store it"""
+        st, cached = self.lookup(scope, file_path)
+        if cached is not None:
+            return cached
+        verdict, file_hash = evaluate()
+        self.store(scope, file_path, st, verdict, file_hash)
+        return verdict, file_hash
+
+    def end_cycle(self):
+        """Write back new verdicts and drop entries that have not been seen lately"""
+        with self._lock:
+            if self._entries is None:
+                return
+            stale = [key for key, entry in self._entries.items()
+                     if self._cycle - entry[4] >= self.prune_cycles]
+            for key in stale:
+                del self._entries[key]
+                self._dirty.pop(key, None)
+            dirty, self._dirty = self._dirty, {}
+            if self._conn is None:
+                return
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO scan_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        [key + tuple(entry[:4]) for key, entry in dirty.items()])
+                    self._conn.executemany(
+                        "DELETE FROM scan_cache WHERE scope = ? AND dev = ? AND ino = ? AND path = ?", stale)
+            except sqlite3.Error as e:
+                log_message(f"Error writing scan cache: {e}", "ERROR")
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries or {})
+
+
+SCAN_CACHE = ScanCache()
+
+# ============================================================================
+# RESOURCE GOVERNOR
+# ============================================================================
+
+class TokenBucket:
+    """Token bucket refilled at rate tokens per second, holding at most burst.
+
+    take() never refuses: it goes into debt and returns how long the caller
+    should sleep to pay it back, so a single large file still goes through
+    and the rate holds on average. A rate of 0 means unlimited.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or rate
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, amount, scale=1.0):
+        rate = self.rate * scale
+        if rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * rate)
+            self._stamp = now
+            self._tokens -= amount
+            return -self._tokens / rate if self._tokens < 0 else 0.0
+
+
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_CLASS_IDLE = 3
+IOPRIO_WHO_PROCESS = 1
+# ioprio_set has no libc wrapper; syscall numbers per architecture
+_IOPRIO_SET_SYSCALL = {
+    'x86_64': 251, 'i386': 289, 'i686': 289, 'aarch64': 30, 'riscv64': 30,
+    'armv7l': 314, 'ppc64le': 273, 's390x': 282
+}
+
+def set_io_idle():
+    """Put every thread of this process in the idle I/O scheduling class.
+
+    I/O priority is per thread and inherited by threads created later, so
+    this is applied to all current threads. Returns True on success.
+    """
+    nr = _IOPRIO_SET_SYSCALL.get(os.uname().machine)
+    if nr is None:
+        log_message(f"ioprio_set not supported on {os.uname().machine}", "WARNING")
+        return False
+    libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+    try:
+        tids = [int(tid) for tid in os.listdir('/proc/self/task')]
+    except OSError:
+        tids = [0]
+    ok = True
+    for tid in tids:
+        if libc.syscall(nr, IOPRIO_WHO_PROCESS, tid, IOPRIO_CLASS_IDLE << IOPRIO_CLASS_SHIFT) != 0:
+            err = ctypes.get_errno()
+            if err != errno.ESRCH:
+                log_message(f"ioprio_set failed for thread {tid}: {os.strerror(err)}", "WARNING")
+                ok = False
+    return ok
+
+
+class ResourceGovernor:
+    """Paces scans so the radar stays in the background on busy hosts.
+
+    Walkers and hashing call throttle() with the files they stat and the
+    bytes they are about to read; the caller sleeps when a token bucket is
+    in debt or the process has used more than its CPU share over the
+    current window. While the 1-minute load average per CPU is above
+    GOVERNOR_LOAD_HIGH all budgets are scaled down in proportion, to at
+    most 1 / GOVERNOR_MAX_BACKOFF; without configured budgets the CPU share
+    GOVERNOR_LOAD_CPU_SHARE is applied (and scaled) only then. Sleeps never
+    run past the caller's deadline.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.io_idle = False
+        self.throttled_seconds = 0.0
+        self.bytes = 0
+        self.files = 0
+        self.scale = 1.0
+        self.load = 0.0
+        self._next_load_check = 0.0
+        self._cpu_mark = (time.monotonic(), time.process_time())
+        self.configure()
+
+    def configure(self):
+        """(Re)read the GOVERNOR_* settings"""
+        self.byte_bucket = TokenBucket(GOVERNOR_MAX_BYTES_PER_SECOND)
+        self.file_bucket = TokenBucket(GOVERNOR_MAX_FILES_PER_SECOND)
+        self.cpu_share = GOVERNOR_CPU_SHARE
+        self.active = bool(GOVERNOR_MAX_BYTES_PER_SECOND or GOVERNOR_MAX_FILES_PER_SECOND
+                           or GOVERNOR_CPU_SHARE)
+
+    def enable_io_idle(self):
+        self.io_idle = set_io_idle()
+        return self.io_idle
+
+    def _update_load(self, now):
+        if now < self._next_load_check:
+            return
+        self._next_load_check = now + GOVERNOR_LOAD_INTERVAL
+        try:
+            self.load = os.getloadavg()[0] / (os.cpu_count() or 1)
+        except OSError:
+            return
+        if self.load > GOVERNOR_LOAD_HIGH:
+            self.scale = max(1.0 / GOVERNOR_MAX_BACKOFF, GOVERNOR_LOAD_HIGH / self.load)
+        else:
+            self.scale = 1.0
+
+    def _cpu_wait(self, now):
+        cpu_share = self.cpu_share
+        if cpu_share <= 0 and self.scale < 1.0:
+            cpu_share = GOVERNOR_LOAD_CPU_SHARE
+        if cpu_share <= 0:
+            return 0.0
+        cpu = time.process_time()
+        with self._lock:
+            mark_wall, mark_cpu = self._cpu_mark
+            if now - mark_wall > GOVERNOR_CPU_WINDOW:
+                self._cpu_mark = (now, cpu)
+                return 0.0
+        return max(0.0, (cpu - mark_cpu) / (cpu_share * self.scale) - (now - mark_wall))
+
+    def throttle(self, nbytes=0, files=0, deadline=None):
+        """Account for work about to be done; sleeps if over budget. Returns seconds slept"""
+        now = time.monotonic()
+        self._update_load(now)
+        if not self.active and (self.scale >= 1.0 or GOVERNOR_LOAD_CPU_SHARE <= 0):
+            return 0.0
+        wait = self._cpu_wait(now)
+        if nbytes:
+            wait = max(wait, self.byte_bucket.take(nbytes, self.scale))
+        if files:
+            wait = max(wait, self.file_bucket.take(files, self.scale))
+        if deadline is not None:
+            wait = min(wait, max(0.0, deadline - now))
+        with self._lock:
+            self.bytes += nbytes
+            self.files += files
+            self.throttled_seconds += wait
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def status(self):
+        """Limits and current state for the status file"""
+        self._update_load(time.monotonic())
+        return {
+            'active': self.active,
+            'max_bytes_per_second': GOVERNOR_MAX_BYTES_PER_SECOND,
+            'max_files_per_second': GOVERNOR_MAX_FILES_PER_SECOND,
+            'cpu_share': self.cpu_share,
+            'load_high': GOVERNOR_LOAD_HIGH,
+            'load_cpu_share': GOVERNOR_LOAD_CPU_SHARE if not self.cpu_share else None,
+            'backing_off': self.scale < 1.0,
+            'load_per_cpu': round(self.load, 2),
+            'backoff_scale': round(self.scale, 3),
+            'io_class': 'idle' if self.io_idle else 'default',
+            'bytes_accounted': self.bytes,
+            'files_accounted': self.files,
+            'throttled_seconds': round(self.throttled_seconds, 3)
+        }
+
+
+GOVERNOR = ResourceGovernor()
+
+# ============================================================================
+# FILESYSTEM WALKER
+# ============================================================================
+
+class BoundedWalk:
+    """Depth-bounded file walk built on os.scandir.
+
+    Directory type comes from d_type, so no stat is needed per entry, and
+    subdirectories deeper than max_depth or starting with an excluded
+    prefix are never opened. Symlinked directories are not followed (as
+    with os.walk). Iterating yields DirEntry objects for non-directories;
+    if a file, time or deadline limit stops the walk early, .truncated
+    holds the reason.
+    """
+
+    def __init__(self, root, max_depth=None, exclude=(), max_files=None,
+                 max_seconds=None, deadline=None):
+        self.root = root
+        self.max_depth = max_depth
+        self.exclude = tuple(exclude)
+        self.max_files = max_files
+        self.deadline = deadline
+        if max_seconds is not None:
+            limit = time.monotonic() + max_seconds
+            if deadline is None or limit < deadline:
+                self.deadline = limit
+                self._deadline_reason = 'max_seconds'
+            else:
+                self._deadline_reason = 'deadline'
+        else:
+            self._deadline_reason = 'deadline'
+        self.truncated = None
+        self.files = 0
+        self.dirs = 0
+
+    def __iter__(self):
+        stack = [(self.root, 0)]
+        exclude = self.exclude
+        while stack:
+            if self.deadline is not None and time.monotonic() > self.deadline:
+                self.truncated = self._deadline_reason
+                return
+            directory, depth = stack.pop()
+            try:
+                it = os.scandir(directory)
+            except OSError:
+                continue
+            self.dirs += 1
+            descend = self.max_depth is None or depth < self.max_depth
+            subdirs = []
+            with it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        if descend and not entry.is_symlink() and \
+                                not (exclude and entry.name.startswith(exclude)):
+                            subdirs.append(entry.path)
+                        continue
+                    if self.max_files is not None and self.files >= self.max_files:
+                        self.truncated = 'max_files'
+                        return
+                    self.files += 1
+                    GOVERNOR.throttle(files=1, deadline=self.deadline)
+                    yield entry
+            # Reverse so directories are visited in listing order
+            stack.extend((subdir, depth + 1) for subdir in reversed(subdirs))
+
+    def report_truncation(self):
+        """Log and record a truncated walk; returns True if it was truncated"""
+        if self.truncated is None:
+            return False
+        log_message(f"Walk of {self.root} truncated ({self.truncated}) after {self.files} files", "WARNING")
+        SCAN_COUNTERS.note('truncated_roots', {
+            'root': self.root,
+            'reason': self.truncated,
+            'files': self.files
+        })
+        return True
+
 # ============================================================================
 # USB/REMOVABLE STORAGE DETECTION
 # ============================================================================
@@ -212,223 +1105,1332 @@ def detect_removable_devices():
     
     return devices
 
-def scan_removable_device(mountpoint):
-    """Scan removable device for threats"""
+def _match_removable_file(file_path, file_name):
+    """Return the signature verdict for one file on a removable device"""
+    return [{
+        'file': file_path,
+        'signature': sig_name,
+        'description': sig_data['description'],
+        'severity': sig_data['severity'],
+        'pattern': pattern
+    } for sig_name, sig_data, pattern in REMOVABLE_MATCHER.match(file_name)]
+
+def scan_removable_device(mountpoint, deadline=None, stats=None):
+    """Scan removable device for threats (stops early past a monotonic deadline)
+
+    If stats is a dict it is filled with files, cached, bytes_read and truncated.
+    """
     threats = []
     
     if not os.path.exists(mountpoint):
         return threats
     
+    # Name verdicts are computed while walking and hashes on the pool; the
+    # results are assembled afterwards in walk order so output is deterministic
+    pool = get_hash_pool()
+    scanned = []
+    cached_count = 0
+    walk = BoundedWalk(mountpoint, exclude=REMOVABLE_SCAN_EXCLUDE, deadline=deadline)
     try:
-        # Scan for signature files
-        for root, dirs, files in os.walk(mountpoint):
-            # Skip system directories
-            if any(skip in root for skip in ['.Trash', 'System Volume Information', '$RECYCLE']):
-                continue
+        for entry in walk:
+            file_path = entry.path
+            file_name = entry.name.lower()
             
-            for file in files:
-                file_path = os.path.join(root, file)
-                file_name = file.lower()
-                
-                # Check against signatures
-                for sig_name, sig_data in CROSS_PLATFORM_SIGNATURES.items():
-                    for pattern in sig_data['patterns']:
-                        if re.search(pattern, file_name, re.IGNORECASE):
-                            threats.append({
-                                'file': file_path,
-                                'signature': sig_name,
-                                'description': sig_data['description'],
-                                'severity': sig_data['severity'],
-                                'pattern': pattern,
-                                'timestamp': datetime.now().isoformat()
-                            })
-                            break
-                
-                # Check file hash for known threats
-                try:
-                    file_hash = calculate_file_hash(file_path)
-                    if is_known_threat(file_hash):
-                        threats.append({
-                            'file': file_path,
-                            'hash': file_hash,
-                            'signature': 'known_threat_hash',
-                            'description': 'Known threat hash match',
-                            'severity': 'CRITICAL',
-                            'timestamp': datetime.now().isoformat()
-                        })
-                except:
-                    pass
+            # Signature and hash verdicts, reused while the file is unchanged
+            if CONTENT_SCAN_ENABLED:
+                # A reloaded content pack re-tags (clears) the cache first
+                CONTENT_MATCHER.digest()
+            st, cached = SCAN_CACHE.lookup('device', file_path)
+            if cached is not None:
+                scanned.append((file_path, st, cached[0], cached[1], None))
+                cached_count += 1
+                continue
+            verdict = _match_removable_file(file_path, file_name)
+            if st is None or not stat.S_ISREG(st.st_mode):
+                # FIFOs, sockets and device nodes are matched by name only;
+                # opening a FIFO would block the walk
+                SCAN_CACHE.store('device', file_path, st, verdict, None)
+                scanned.append((file_path, st, verdict, None, None))
+                continue
+            future = pool.submit(file_path, st.st_size if st else 0, scan_content=CONTENT_SCAN_ENABLED,
+                                 deadline=deadline)
+            scanned.append((file_path, st, verdict, None, future))
     except Exception as e:
         log_message(f"Error scanning {mountpoint}: {e}", "ERROR")
+    walk.report_truncation()
     
+    bytes_read = 0
+    for file_path, st, verdict, file_hash, future in scanned:
+        if future is not None:
+            try:
+                file_hash, nbytes, _, stream = future.result()
+            except Exception:
+                file_hash, nbytes, stream = None, 0, None
+            bytes_read += nbytes
+            # Content matches are part of the cached verdict
+            if stream is not None and stream.found:
+                verdict = verdict + CONTENT_MATCHER.threats(file_path, stream.found)
+            SCAN_CACHE.store('device', file_path, st, verdict, file_hash)
+        timestamp = datetime.now().isoformat()
+        threats.extend(dict(threat, timestamp=timestamp) for threat in verdict)
+        
+        # Check file hash for known threats
+        if is_known_threat(file_hash):
+            threats.append({
+                'file': file_path,
+                'hash': file_hash,
+                'signature': 'known_threat_hash',
+                'description': 'Known threat hash match',
+                'severity': 'CRITICAL',
+                'timestamp': timestamp
+            })
+    
+    if stats is not None:
+        stats.update({
+            'files': len(scanned),
+            'cached': cached_count,
+            'bytes_read': bytes_read,
+            'truncated': walk.truncated
+        })
     return threats
 
+_device_executor = None
+_device_executor_lock = threading.Lock()
+
+def _get_device_executor():
+    global _device_executor
+    with _device_executor_lock:
+        if _device_executor is None:
+            _device_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=REMOVABLE_SCAN_WORKERS, thread_name_prefix='radar-device')
+        return _device_executor
+
+def _scan_device_group(mountpoints, block_device, deadline):
+    """Scan the mountpoints of one block device in turn; returns [(threats, stats)]"""
+    results = []
+    for mountpoint in mountpoints:
+        stats = {}
+        start = time.perf_counter()
+        try:
+            threats = scan_removable_device(mountpoint, deadline=deadline, stats=stats)
+            error = None
+        except Exception as e:
+            threats, error = [], str(e)
+            log_message(f"Error scanning {mountpoint}: {e}", "ERROR")
+        seconds = time.perf_counter() - start
+        stats.update({
+            'mountpoint': mountpoint,
+            'block_device': block_device,
+            'seconds': round(seconds, 3),
+            'threats': len(threats),
+            'files_per_second': int(stats.get('files', 0) / seconds) if seconds > 0 else 0,
+            'bytes_per_second': int(stats.get('bytes_read', 0) / seconds) if seconds > 0 else 0,
+            'error': error
+        })
+        results.append((threats, stats))
+    return results
+
+def scan_removable_devices(mountpoints, deadline=None):
+    """Scan several removable devices concurrently, one worker per block device.
+
+    Returns (threats, per-device stats), both in the order of mountpoints.
+    """
+    groups = {}
+    for mountpoint in dict.fromkeys(mountpoints):
+        groups.setdefault(block_device_of(mountpoint) or mountpoint, []).append(mountpoint)
+    if len(groups) <= 1:
+        results = [item for block_device, group in groups.items()
+                   for item in _scan_device_group(group, block_device, deadline)]
+    else:
+        executor = _get_device_executor()
+        futures = [executor.submit(_scan_device_group, group, block_device, deadline)
+                   for block_device, group in groups.items()]
+        results = [item for future in futures for item in future.result()]
+    by_mountpoint = {stats['mountpoint']: (threats, stats) for threats, stats in results}
+    threats = []
+    device_stats = []
+    for mountpoint in dict.fromkeys(mountpoints):
+        device_threats, stats = by_mountpoint[mountpoint]
+        threats.extend(device_threats)
+        device_stats.append(stats)
+    return threats, device_stats
+
+# ============================================================================
+# KNOWN-THREAT HASH INDEX
+# ============================================================================
+
+class BloomFilter:
+    """Fixed-size Bloom filter over hex digests (no false negatives)"""
+
+    def __init__(self, capacity, bits_per_entry=SIGNATURE_INDEX_BLOOM_BITS_PER_ENTRY,
+                 probes=SIGNATURE_INDEX_BLOOM_PROBES):
+        self.size = max(64, capacity * bits_per_entry)
+        self.probes = probes
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        # SHA256 hex digests are already uniformly distributed, so the two
+        # base hashes for double hashing come straight from the digest
+        try:
+            h1 = int(key[:16], 16)
+            h2 = int(key[16:32], 16) | 1
+        except ValueError:
+            digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+            h1 = int.from_bytes(digest[:8], 'little')
+            h2 = int.from_bytes(digest[8:], 'little') | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.probes)]
+
+    def add(self, key):
+        bits = self.bits
+        for pos in self._positions(key):
+            bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        bits = self.bits
+        for pos in self._positions(key):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+
+class SignatureIndex:
+    """Known-threat hash index loaded once from SIGNATURE_DB.
+
+    Small feeds are held in a set. Feeds above SIGNATURE_INDEX_BLOOM_THRESHOLD
+    are held as one sorted blob of raw 32-byte digests behind a Bloom filter,
+    so the common (clean) lookup never touches the table. The DB is reloaded
+    only when its mtime changes.
+    """
+
+    def __init__(self, db_path=SIGNATURE_DB, recheck_interval=SIGNATURE_INDEX_RECHECK_INTERVAL):
+        self.db_path = db_path
+        self.recheck_interval = recheck_interval
+        self._lock = threading.Lock()
+        self._mtime_ns = None
+        self._next_check = 0.0
+        self._hashes = frozenset()
+        self._bloom = None
+        self._table = b''
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        with self._lock:
+            if now < self._next_check:
+                return
+            self._next_check = now + self.recheck_interval
+            try:
+                mtime_ns = os.stat(self.db_path).st_mtime_ns
+            except OSError:
+                mtime_ns = None
+            if mtime_ns == self._mtime_ns:
+                return
+            self._load(mtime_ns)
+
+    def _load(self, mtime_ns):
+        known = []
+        if mtime_ns is not None:
+            try:
+                with open(self.db_path, 'r') as f:
+                    db = json.load(f)
+                known = db.get('known_threat_hashes', [])
+            except Exception as e:
+                log_message(f"Error loading signature DB {self.db_path}: {e}", "ERROR")
+                # Keep the previous index; retry once the file changes again
+                self._mtime_ns = mtime_ns
+                return
+
+        hashes = set(h.lower() for h in known if isinstance(h, str))
+        bloom = None
+        table = b''
+        if len(hashes) > SIGNATURE_INDEX_BLOOM_THRESHOLD:
+            digests = []
+            others = set()
+            for h in hashes:
+                try:
+                    digests.append(bytes.fromhex(h) if len(h) == 64 else None)
+                except ValueError:
+                    digests.append(None)
+                if digests[-1] is None:
+                    digests.pop()
+                    others.add(h)
+            digests.sort()
+            bloom = BloomFilter(len(hashes))
+            for h in hashes:
+                bloom.add(h)
+            table = b''.join(digests)
+            hashes = others
+
+        # Swap in the new index in one step so concurrent lookups never see
+        # a half-built table
+        self._hashes, self._bloom, self._table = frozenset(hashes), bloom, table
+        self._count = len(hashes) + len(table) // 32
+        self._mtime_ns = mtime_ns
+        log_message(f"Signature index loaded: {self._count} known hashes"
+                    f"{' (bloom)' if bloom is not None else ''}", "INFO")
+
+    def _table_contains(self, table, digest):
+        lo, hi = 0, len(table) // 32
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry = table[mid * 32:mid * 32 + 32]
+            if entry < digest:
+                lo = mid + 1
+            elif entry > digest:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def __contains__(self, file_hash):
+        if not file_hash:
+            return False
+        pack = SIGNATURE_PACK.current()
+        if pack is not None and pack.contains_hash(file_hash):
+            return True
+        self._maybe_reload()
+        file_hash = file_hash.lower()
+        hashes, bloom, table = self._hashes, self._bloom, self._table
+        if file_hash in hashes:
+            return True
+        if bloom is None or file_hash not in bloom:
+            return False
+        try:
+            digest = bytes.fromhex(file_hash)
+        except ValueError:
+            return False
+        return self._table_contains(table, digest)
+
+
+# Shared by radar_scan and scan_removable_device
+SIGNATURE_INDEX = SignatureIndex()
+
+# ============================================================================
+# CONTENT SIGNATURE ENGINE
+# ============================================================================
+
+class _NeedleSet:
+    """Byte needles searched in one pass over a buffer.
+
+    Small sets use one bytes.find per needle (C speed, GB/s each); larger
+    sets use a single compiled alternation, restarted one byte after each
+    hit so overlapping needles are all seen. Only the first offset per
+    signature is recorded.
+    """
+
+    def __init__(self, needles):
+        # needles: {needle bytes: signature name}
+        self.needles = sorted(needles.items(), key=lambda item: -len(item[0]))
+        self.max_len = max((len(n) for n in needles), default=0)
+        self._regex = None
+        self._shorter = {}
+        if len(self.needles) > CONTENT_FIND_MAX_PATTERNS:
+            self._regex = re.compile(b'|'.join(re.escape(n) for n, _ in self.needles))
+            # The alternation reports the longest needle at a position; keep
+            # track of the shorter ones it hides
+            for needle, _ in self.needles:
+                self._shorter[needle] = [(n, sig) for n, sig in self.needles
+                                         if len(n) < len(needle) and needle.startswith(n)]
+        self._by_needle = dict(self.needles)
+
+    def scan(self, data, base, found, end):
+        if self._regex is None:
+            for needle, sig_name in self.needles:
+                if sig_name in found:
+                    continue
+                offset = data.find(needle, 0, end)
+                if offset >= 0:
+                    found[sig_name] = base + offset
+            return
+        search = self._regex.search
+        m = search(data, 0, end)
+        while m:
+            needle = m.group()
+            found.setdefault(self._by_needle[needle], base + m.start())
+            for _, sig_name in self._shorter[needle]:
+                found.setdefault(sig_name, base + m.start())
+            m = search(data, m.start() + 1, end)
+
+
+class ContentMatcher:
+    """Content signatures compiled from CONTENT_SIGNATURES plus a JSON pack.
+
+    The pack maps signature names to {'patterns_hex': [...], 'description',
+    'severity', 'nocase'}; it is reloaded when its mtime changes. nocase
+    needles are matched against a lowercased copy of the window.
+    on_reload(digest) is called when a reload changes the effective
+    signatures, so verdicts cached with the old ones can be dropped.
+    """
+
+    def __init__(self, signatures=None, pack_path=CONTENT_SIGNATURE_PACK,
+                 recheck_interval=SIGNATURE_INDEX_RECHECK_INTERVAL, on_reload=None):
+        self.base_signatures = CONTENT_SIGNATURES if signatures is None else signatures
+        self.pack_path = pack_path
+        self.recheck_interval = recheck_interval
+        self.on_reload = on_reload
+        self._digest = None
+        self._lock = threading.Lock()
+        self._mtime_ns = False
+        self._next_check = 0.0
+        self._compiled = None
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check and self._compiled is not None:
+            return self._compiled
+        with self._lock:
+            if now < self._next_check and self._compiled is not None:
+                return self._compiled
+            self._next_check = now + self.recheck_interval
+            try:
+                mtime_ns = os.stat(self.pack_path).st_mtime_ns if self.pack_path else None
+            except OSError:
+                mtime_ns = None
+            if mtime_ns != self._mtime_ns or self._compiled is None:
+                self._compiled = self._compile(mtime_ns)
+            return self._compiled
+
+    def _compile(self, mtime_ns):
+        signatures = dict(self.base_signatures)
+        if mtime_ns is not None:
+            try:
+                with open(self.pack_path, 'r') as f:
+                    signatures.update(json.load(f))
+            except Exception as e:
+                log_message(f"Error loading content signature pack {self.pack_path}: {e}", "ERROR")
+        self._mtime_ns = mtime_ns
+
+        exact, nocase = {}, {}
+        for sig_name, sig_data in signatures.items():
+            for pattern in sig_data.get('patterns_hex', []):
+                try:
+                    needle = bytes.fromhex(pattern)
+                except (TypeError, ValueError):
+                    continue
+                if not needle:
+                    continue
+                if sig_data.get('nocase'):
+                    nocase[needle.lower()] = sig_name
+                else:
+                    exact[needle] = sig_name
+        exact, nocase = _NeedleSet(exact), _NeedleSet(nocase)
+        digest = hashlib.sha256(json.dumps(signatures, sort_keys=True).encode()).hexdigest()[:16]
+        previous, self._digest = self._digest, digest
+        if previous is not None and digest != previous and self.on_reload is not None:
+            self.on_reload(digest)
+        return signatures, exact, nocase, max(exact.max_len, nocase.max_len), digest
+
+    def set_base_signatures(self, signatures):
+        """Replace the built-in signatures (e.g. from a signature pack)"""
+        with self._lock:
+            self.base_signatures = signatures
+            self._compiled = None
+
+    @property
+    def max_len(self):
+        return self._maybe_reload()[3]
+
+    def digest(self):
+        """Short digest of the effective content signatures"""
+        return self._maybe_reload()[4]
+
+    def scan(self, data, base=0, found=None, end=None):
+        """Add {signature: first offset} for needles found in data[:end] to found"""
+        if found is None:
+            found = {}
+        _, exact, nocase, _, _ = self._maybe_reload()
+        if end is None or end > len(data):
+            end = len(data)
+        if exact.needles:
+            exact.scan(data, base, found, end)
+        if nocase.needles:
+            nocase.scan(bytes(data[:end]).lower(), base, found, end)
+        return found
+
+    def threats(self, file_path, found):
+        """Turn scan() results into threat records"""
+        signatures = self._maybe_reload()[0]
+        return [{
+            'file': file_path,
+            'signature': sig_name,
+            'description': signatures.get(sig_name, {}).get('description', 'Content signature match'),
+            'severity': signatures.get(sig_name, {}).get('severity', 'HIGH'),
+            'offset': offset
+        } for sig_name, offset in sorted(found.items(), key=lambda item: item[1])]
+
+
+class ContentStream:
+    """Feeds consecutive chunks of one file to a ContentMatcher.
+
+    The last max_len - 1 bytes of each window are carried into the next,
+    so needles spanning a chunk boundary are still found. Stops after
+    limit bytes.
+    """
+
+    def __init__(self, matcher, limit=None):
+        self.matcher = matcher
+        self.limit = CONTENT_SCAN_MAX_BYTES if limit is None else limit
+        self.found = {}
+        self.offset = 0
+        self.seconds = 0.0
+        self._overlap = max(0, matcher.max_len - 1)
+        self._tail = b''
+
+    @property
+    def done(self):
+        return bool(self.limit) and self.offset >= self.limit
+
+    def feed(self, chunk):
+        if self.done:
+            return
+        start = time.perf_counter()
+        if self.limit:
+            chunk = chunk[:self.limit - self.offset]
+        window = self._tail + bytes(chunk)
+        self.matcher.scan(window, self.offset - len(self._tail), self.found)
+        self.offset += len(chunk)
+        self._tail = window[-self._overlap:] if self._overlap else b''
+        self.seconds += time.perf_counter() - start
+
+    def scan_buffer(self, buf):
+        """Search a whole in-memory buffer (e.g. an mmap) without copying it"""
+        start = time.perf_counter()
+        end = min(len(buf), self.limit) if self.limit else len(buf)
+        self.matcher.scan(buf, 0, self.found, end)
+        self.offset = end
+        self.seconds += time.perf_counter() - start
+
+    def scan_file(self, f, chunk_size=HASH_CHUNK_SIZE):
+        """Read and search the first limit bytes of an open file"""
+        _, view = _get_hash_buffer(chunk_size)
+        while not self.done:
+            n = f.readinto(view)
+            if not n:
+                break
+            self.feed(view[:n])
+
+
+CONTENT_MATCHER = ContentMatcher(on_reload=lambda digest: _apply_signature_tag(digest))
+
+def _open_regular(file_path):
+    """Open file_path unbuffered for reading, refusing anything but a regular file
+
+    O_NONBLOCK keeps open() from hanging on a FIFO with no writer; it has no
+    effect on reads from regular files. Sockets, FIFOs and device nodes
+    raise OSError(EINVAL).
+    """
+    fd = os.open(file_path, os.O_RDONLY | os.O_NONBLOCK | getattr(os, 'O_CLOEXEC', 0))
+    try:
+        if not stat.S_ISREG(os.fstat(fd).st_mode):
+            raise OSError(errno.EINVAL, 'not a regular file', file_path)
+        return os.fdopen(fd, 'rb', buffering=0)
+    except:
+        os.close(fd)
+        raise
+
+def scan_file_content(file_path, limit=None, deadline=None):
+    """Return {signature: offset} for content signatures found in file_path
+
+    Governor waits are cut short at deadline (monotonic), as for walks.
+    """
+    stream = ContentStream(CONTENT_MATCHER, limit)
+    try:
+        with _open_regular(file_path) as f:
+            size = os.fstat(f.fileno()).st_size
+            if size > 0:
+                GOVERNOR.throttle(nbytes=min(size, stream.limit or size), deadline=deadline)
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    stream.scan_buffer(mm)
+    except (OSError, ValueError):
+        pass
+    _record_content(stream)
+    return stream.found
+
+def _record_content(stream):
+    if stream is None:
+        return
+    SCAN_COUNTERS.add('content_files')
+    SCAN_COUNTERS.add('content_bytes', stream.offset)
+    SCAN_COUNTERS.add('content_seconds', stream.seconds)
+
+def content_status():
+    """Summarize content scanning throughput for the status file"""
+    counters = SCAN_COUNTERS.snapshot()
+    seconds = counters.get('content_seconds', 0)
+    nbytes = counters.get('content_bytes', 0)
+    return {
+        'enabled': CONTENT_SCAN_ENABLED,
+        'files_scanned': counters.get('content_files', 0),
+        'bytes_scanned': nbytes,
+        'scan_seconds': round(seconds, 3),
+        'bytes_per_second': int(nbytes / seconds) if seconds > 0 else 0,
+        'max_bytes': CONTENT_SCAN_MAX_BYTES
+    }
+
+def benchmark_content_matcher(megabytes=256, seed=1337):
+    """Measure content matching throughput on random data with planted needles"""
+    import random
+    rng = random.Random(seed)
+    size = megabytes * 1024 * 1024
+    # randbytes() cannot produce more than 256 MB in one call
+    data = bytearray()
+    for pos in range(0, size, 16 * 1024 * 1024):
+        data += rng.randbytes(min(16 * 1024 * 1024, size - pos))
+    _, exact, nocase, _, _ = CONTENT_MATCHER._maybe_reload()
+    planted = {}
+    for needle, sig_name in exact.needles + nocase.needles:
+        offset = rng.randrange(0, size - len(needle))
+        data[offset:offset + len(needle)] = needle
+        planted.setdefault(sig_name, offset)
+    data = bytes(data)
+
+    stream = ContentStream(CONTENT_MATCHER, limit=0)
+    start = time.perf_counter()
+    for pos in range(0, size, HASH_CHUNK_SIZE):
+        stream.feed(data[pos:pos + HASH_CHUNK_SIZE])
+    elapsed = time.perf_counter() - start
+    return {
+        'megabytes': megabytes,
+        'patterns': len(exact.needles) + len(nocase.needles),
+        'mode': 'alternation' if len(exact.needles) > CONTENT_FIND_MAX_PATTERNS else 'find',
+        'seconds': round(elapsed, 3),
+        'mb_per_second': round(megabytes / elapsed, 1),
+        'signatures_planted': len(planted),
+        'signatures_found': len(stream.found)
+    }
+
 # ============================================================================
 # SIGNATURE SCANNING FUNCTIONS
 # ============================================================================
 
-def calculate_file_hash(file_path):
-    """Calculate SHA256 hash of file"""
+class ScanCounters:
+    """Thread-safe counters for the current scan cycle"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def add(self, name, amount=1):
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + amount
+
+    def get(self, name, default=0):
+        with self._lock:
+            return self._values.get(name, default)
+
+    def note(self, name, item):
+        """Append item to the list kept under name"""
+        with self._lock:
+            self._values.setdefault(name, []).append(item)
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+
+SCAN_COUNTERS = ScanCounters()
+
+_hash_buffers = threading.local()
+
+def _get_hash_buffer(size):
+    """Return this thread's reusable read buffer and a memoryview over it"""
+    buf = getattr(_hash_buffers, 'buf', None)
+    if buf is None or len(buf) != size:
+        buf = bytearray(size)
+        _hash_buffers.buf = buf
+        _hash_buffers.view = memoryview(buf)
+    return buf, _hash_buffers.view
+
+def _hash_file(file_path, max_bytes=None, use_mmap=False, chunk_size=HASH_CHUNK_SIZE, content=None):
+    """Return (sha256 hexdigest, bytes read); digest is None if skipped
+
+    A ContentStream passed as content is fed the same bytes, so each file
+    is read once for both hashing and content matching.
+    """
+    h = hashlib.sha256()
+    with _open_regular(file_path) as f:
+        size = os.fstat(f.fileno()).st_size
+        if max_bytes and size > max_bytes:
+            # Too big to hash, but the head of the file is still searched
+            if content is not None:
+                content.scan_file(f, chunk_size)
+            return None, 0
+
+        if use_mmap and size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, 'madvise'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                h.update(mm)
+                if content is not None:
+                    content.scan_buffer(mm)
+                return h.hexdigest(), len(mm)
+
+        _, view = _get_hash_buffer(chunk_size)
+        total = 0
+        while True:
+            n = f.readinto(view)
+            if not n:
+                break
+            total += n
+            # File is growing while we read it; give up rather than chase it
+            if max_bytes and total > max_bytes:
+                return None, total
+            h.update(view[:n])
+            if content is not None:
+                content.feed(view[:n])
+        return h.hexdigest(), total
+
+def _hash_worker(file_path, max_bytes, use_mmap, content_max_bytes=None):
+    """Return (sha256 or None, bytes read, seconds, content stream or None); runs in pool workers
+
+    Content matching is skipped when content_max_bytes is None.
+    """
+    start = time.perf_counter()
+    stream = None if content_max_bytes is None else ContentStream(CONTENT_MATCHER, content_max_bytes)
     try:
-        with open(file_path, 'rb') as f:
-            content = f.read()
-        return hashlib.sha256(content).hexdigest()
+        file_hash, nbytes = _hash_file(file_path, max_bytes, use_mmap, content=stream)
     except:
-        return None
+        file_hash, nbytes = None, 0
+    if stream is not None:
+        # Only the results cross back from a process pool
+        stream.matcher = stream._tail = None
+    return file_hash, nbytes, time.perf_counter() - start, stream
+
+def _init_hash_worker(signatures):
+    """Process pool initializer: match with the parent's content signatures"""
+    global CONTENT_MATCHER
+    CONTENT_MATCHER = ContentMatcher(signatures, pack_path=None)
+
+def _record_hash(file_hash, nbytes, seconds, stream=None):
+    SCAN_COUNTERS.add('hash_seconds', seconds)
+    SCAN_COUNTERS.add('bytes_hashed', nbytes)
+    SCAN_COUNTERS.add('files_hashed' if file_hash else 'files_hash_skipped')
+    _record_content(stream)
+
+def calculate_file_hash(file_path, max_bytes=None, use_mmap=None, deadline=None):
+    """Calculate SHA256 hash of file (streamed, size-capped; governor waits end at deadline)"""
+    if max_bytes is None:
+        max_bytes = HASH_MAX_BYTES
+    if use_mmap is None:
+        use_mmap = HASH_USE_MMAP
+    try:
+        GOVERNOR.throttle(nbytes=min(os.path.getsize(file_path), max_bytes or sys.maxsize),
+                          deadline=deadline)
+    except OSError:
+        pass
+    file_hash, nbytes, seconds, _ = _hash_worker(file_path, max_bytes, use_mmap)
+    _record_hash(file_hash, nbytes, seconds)
+    return file_hash
+
+class HashPool:
+    """Worker pool for file hashing with a cap on in-flight bytes.
+
+    submit() blocks while the files already queued or being hashed add up
+    to more than max_inflight_bytes, which bounds both the queue and the
+    page cache / mmap footprint of a scan. hashlib releases the GIL on
+    large buffers, so threads scale for hashing; 'process' is available
+    for hosts where it does not. Spawned workers get the effective content
+    signatures (built-ins plus both packs) when they start, and the
+    process pool is replaced when those signatures change.
+    """
+
+    def __init__(self, workers=None, kind=None, max_inflight_bytes=None):
+        self.workers = max(1, workers or HASH_WORKERS)
+        self.kind = kind or HASH_POOL_KIND
+        self.max_inflight_bytes = max_inflight_bytes or HASH_MAX_INFLIGHT_BYTES
+        self._inflight = 0
+        self._cond = threading.Condition()
+        self._signature_digest = None
+        self._executor = self._make_executor()
+
+    def _make_executor(self):
+        if self.kind == 'process':
+            import multiprocessing
+            signatures, _, _, _, self._signature_digest = CONTENT_MATCHER._maybe_reload()
+            return concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_hash_worker, initargs=(signatures,))
+        return concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix='radar-hash')
+
+    def submit(self, file_path, size, scan_content=False, deadline=None):
+        """Queue file_path for hashing; the future yields (sha256, bytes, seconds, content stream)
+
+        Governor waits are cut short at deadline (monotonic).
+        """
+        cost = min(size, HASH_MAX_BYTES) if HASH_MAX_BYTES else size
+        GOVERNOR.throttle(nbytes=cost, deadline=deadline)
+        digest = CONTENT_MATCHER.digest() if scan_content and self.kind == 'process' else None
+        with self._cond:
+            while self._inflight > 0 and self._inflight + cost > self.max_inflight_bytes:
+                self._cond.wait()
+            self._inflight += cost
+            if digest is not None and digest != self._signature_digest:
+                # Work already queued finishes on the old workers
+                self._executor.shutdown(wait=False)
+                self._executor = self._make_executor()
+            future = self._executor.submit(_hash_worker, file_path, HASH_MAX_BYTES, HASH_USE_MMAP,
+                                           CONTENT_SCAN_MAX_BYTES if scan_content else None)
+        future.add_done_callback(lambda f: self._finished(f, cost))
+        return future
+
+    def _finished(self, future, cost):
+        with self._cond:
+            self._inflight -= cost
+            self._cond.notify_all()
+        if not future.cancelled() and future.exception() is None:
+            _record_hash(*future.result())
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+_hash_pool = None
+_hash_pool_lock = threading.Lock()
+
+def get_hash_pool():
+    """Return the shared HashPool, created from the current config on first use"""
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            _hash_pool = HashPool()
+        return _hash_pool
+
+def hashing_status():
+    """Summarize hashing throughput for the status file"""
+    counters = SCAN_COUNTERS.snapshot()
+    seconds = counters.get('hash_seconds', 0)
+    nbytes = counters.get('bytes_hashed', 0)
+    return {
+        'files_hashed': counters.get('files_hashed', 0),
+        'files_skipped': counters.get('files_hash_skipped', 0),
+        'bytes_hashed': nbytes,
+        'hash_seconds': round(seconds, 3),
+        'bytes_per_second': int(nbytes / seconds) if seconds > 0 else 0,
+        'max_bytes': HASH_MAX_BYTES,
+        'mmap': HASH_USE_MMAP,
+        'workers': HASH_WORKERS,
+        'pool': HASH_POOL_KIND
+    }
 
 def is_known_threat(file_hash):
     """Check if file hash matches known threat"""
-    # Load threat database
-    if os.path.exists(SIGNATURE_DB):
-        try:
-            with open(SIGNATURE_DB, 'r') as f:
-                db = json.load(f)
-                known_hashes = db.get('known_threat_hashes', [])
-                return file_hash in known_hashes
-        except:
-            pass
-    return False
+    return file_hash in SIGNATURE_INDEX
+
+class ProcessVerdictCache:
+    """Signature verdicts for running processes keyed on (pid, create_time).
+
+    A (pid, create_time) pair names one process for its whole life, so its
+    command line only has to be read and matched once; the process name is
+    kept as well so a process that exec()s something else is re-matched.
+    Entries for processes that are gone are dropped every scan.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._verdicts = {}
+
+    def scan(self, deadline=None):
+        """Return [(proc, verdict)] for every process with a matching verdict
+
+        Stops early past a monotonic deadline, keeping the cached verdicts of
+        the processes it did not get to.
+        """
+        matches = []
+        alive = {}
+        hits = evaluated = 0
+        truncated = False
+        for proc in psutil.process_iter(['pid', 'name', 'create_time']):
+            if deadline is not None and time.monotonic() > deadline:
+                truncated = True
+                break
+            try:
+                info = proc.info
+                key = (info['pid'], info['create_time'])
+                name = info['name'] or ''
+                with self._lock:
+                    cached = self._verdicts.get(key)
+                if cached is not None and cached[0] == name:
+                    verdict = cached[1]
+                    hits += 1
+                else:
+                    with proc.oneshot():
+                        verdict = _match_process(proc, name)
+                    evaluated += 1
+                alive[key] = (name, verdict)
+                if verdict:
+                    matches.append((proc, verdict))
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        with self._lock:
+            if truncated:
+                self._verdicts.update(alive)
+            else:
+                self._verdicts = alive
+        SCAN_COUNTERS.add('process_cache_hits', hits)
+        SCAN_COUNTERS.add('process_evaluated', evaluated)
+        return matches
+
+    def clear(self):
+        with self._lock:
+            self._verdicts = {}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._verdicts)
+
+
+PROCESS_VERDICTS = ProcessVerdictCache()
 
-def scan_process_signatures():
-    """Scan running processes for threat signatures"""
+def _match_process(proc, name):
+    """Return the signature verdict for one process (call inside oneshot())"""
+    try:
+        cmdline_list = proc.cmdline() or []
+    except psutil.AccessDenied:
+        cmdline_list = []
+    cmdline = ' '.join(cmdline_list).lower()
+    return [{
+        'pid': proc.pid,
+        'name': name,
+        'cmdline': cmdline_list,
+        'create_time': proc.info['create_time'],
+        'signature': sig_name,
+        'description': sig_data['description'],
+        'severity': sig_data['severity']
+    } for sig_name, sig_data, _ in PROCESS_MATCHER.match(name.lower(), cmdline)]
+
+def scan_process_signatures(deadline=None):
+    """Scan running processes for threat signatures (stops early past a monotonic deadline)"""
     threats = []
     
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline', 'cpu_percent', 'memory_percent']):
+    # Only new or exec'd processes are matched; live usage is read for the
+    # few that matched
+    for proc, verdict in PROCESS_VERDICTS.scan(deadline):
         try:
-            proc_info = proc.info
-            proc_name = proc_info['name'].lower()
-            cmdline_list = proc_info.get('cmdline', []) or []
-            cmdline = ' '.join(cmdline_list).lower() if cmdline_list else ''
-            
-            # Check against signatures
-            for sig_name, sig_data in CROSS_PLATFORM_SIGNATURES.items():
-                if 'process' in sig_name or 'behavioral' in sig_name:
-                    for pattern in sig_data['patterns']:
-                        if re.search(pattern, proc_name, re.IGNORECASE) or \
-                           re.search(pattern, cmdline, re.IGNORECASE):
-                            threats.append({
-                                'pid': proc_info['pid'],
-                                'name': proc_info['name'],
-                                'cmdline': proc_info.get('cmdline', []),
-                                'signature': sig_name,
-                                'description': sig_data['description'],
-                                'severity': sig_data['severity'],
-                                'cpu': proc_info.get('cpu_percent', 0),
-                                'memory': proc_info.get('memory_percent', 0),
-                                'timestamp': datetime.now().isoformat()
-                            })
-                            break
+            with proc.oneshot():
+                cpu = proc.cpu_percent()
+                memory = proc.memory_percent()
         except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
+            cpu = memory = 0
+        timestamp = datetime.now().isoformat()
+        for threat in verdict:
+            threats.append(dict(threat, cpu=cpu, memory=memory, timestamp=timestamp))
     
     return threats
 
-def scan_file_signatures(directory='/', max_depth=3):
-    """Scan files for threat signatures"""
+def _evaluate_critical_file(file_path, file_name, deadline=None):
+    """Return the signature verdict for one file in the critical-file sweep"""
+    verdict = [{
+        'file': file_path,
+        'signature': sig_name,
+        'description': sig_data['description'],
+        'severity': sig_data['severity']
+    } for sig_name, sig_data, _ in FILE_MATCHER.match(file_name)]
+    if CONTENT_SCAN_ENABLED:
+        found = scan_file_content(file_path, deadline=deadline)
+        if found:
+            verdict.extend(CONTENT_MATCHER.threats(file_path, found))
+    return verdict
+
+def scan_critical_file(file_path, deadline=None):
+    """Check one file against the critical-file signatures"""
+    file_name = os.path.basename(file_path).lower()
+    if CONTENT_SCAN_ENABLED:
+        # A reloaded content pack re-tags (clears) the cache first
+        CONTENT_MATCHER.digest()
+    verdict, _ = SCAN_CACHE.evaluate(
+        'files', file_path, lambda: (_evaluate_critical_file(file_path, file_name, deadline), None))
+    timestamp = datetime.now().isoformat()
+    return [dict(threat, timestamp=timestamp) for threat in verdict]
+
+def scan_file_signatures(directory='/', max_depth=3, deadline=None, scan_dirs=None):
+    """Scan files for threat signatures (stops early past a monotonic deadline)"""
     threats = []
     scanned = 0
     
     # Focus on common threat locations
-    scan_dirs = [
-        '/tmp', '/var/tmp', '/dev/shm',
-        '/home', '/root', '/opt',
-        '/media', '/mnt', '/run/media'
-    ]
+    if scan_dirs is None:
+        scan_dirs = FILE_SCAN_DIRS
     
     for scan_dir in scan_dirs:
         if not os.path.exists(scan_dir):
             continue
+        if deadline is not None and time.monotonic() > deadline:
+            log_message(f"Deadline reached, skipping {scan_dir}", "WARNING")
+            continue
         
+        walk = BoundedWalk(scan_dir, max_depth=max_depth, exclude=FILE_SCAN_EXCLUDE,
+                           max_files=FILE_SCAN_MAX_FILES_PER_ROOT,
+                           max_seconds=FILE_SCAN_MAX_SECONDS_PER_ROOT, deadline=deadline)
         try:
-            for root, dirs, files in os.walk(scan_dir):
-                # Limit depth
-                depth = root[len(scan_dir):].count(os.sep)
-                if depth > max_depth:
-                    dirs[:] = []
-                    continue
+            for entry in walk:
+                # Check against signatures, reusing the verdict while unchanged
+                threats.extend(scan_critical_file(entry.path, deadline))
                 
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    file_name = file.lower()
-                    
-                    # Check against signatures
-                    for sig_name, sig_data in CROSS_PLATFORM_SIGNATURES.items():
-                        if 'file' in sig_name or 'usb' in sig_name:
-                            for pattern in sig_data['patterns']:
-                                if re.search(pattern, file_name, re.IGNORECASE):
-                                    threats.append({
-                                        'file': file_path,
-                                        'signature': sig_name,
-                                        'description': sig_data['description'],
-                                        'severity': sig_data['severity'],
-                                        'timestamp': datetime.now().isoformat()
-                                    })
-                                    break
-                    
-                    scanned += 1
-                    if scanned % 1000 == 0:
-                        log_message(f"Scanned {scanned} files...", "INFO")
+                scanned += 1
+                if scanned % 1000 == 0:
+                    log_message(f"Scanned {scanned} files...", "INFO")
         except Exception as e:
             log_message(f"Error scanning {scan_dir}: {e}", "ERROR")
+        walk.report_truncation()
     
     return threats
 
-def scan_network_signatures():
-    """Scan network connections for threat signatures"""
+# ----------------------------------------------------------------------------
+# /proc/net fast path
+# ----------------------------------------------------------------------------
+
+TCP_STATES = {
+    '01': 'ESTABLISHED', '02': 'SYN_SENT', '03': 'SYN_RECV', '04': 'FIN_WAIT1',
+    '05': 'FIN_WAIT2', '06': 'TIME_WAIT', '07': 'CLOSE', '08': 'CLOSE_WAIT',
+    '09': 'LAST_ACK', '0A': 'LISTEN', '0B': 'CLOSING', '0C': 'NEW_SYN_RECV'
+}
+
+# sl: local rem st tx:rx tr:when retrnsmt uid timeout inode
+_PROC_NET_LINE = re.compile(
+    r': ([0-9A-F]+):([0-9A-F]{4}) ([0-9A-F]+):([0-9A-F]{4}) ([0-9A-F]{2}) '
+    r'[^ ]+ [^ ]+ [^ ]+ +[0-9]+ +[0-9]+ ([0-9]+)')
+
+def parse_proc_net(kinds=('tcp', 'tcp6', 'udp', 'udp6'), base=None):
+    """Parse /proc/net socket tables into compact tuples.
+
+    Returns [(kind, local_hex, local_port, remote_hex, remote_port, status, inode)].
+    Addresses stay as kernel hex strings; decode_proc_net_address() turns
+    the few that are needed into printable IPs. UDP sockets get status
+    'NONE', as psutil reports them. Missing tables (tcp6/udp6 with IPv6
+    disabled) are skipped; OSError is raised only if base itself is missing.
+    """
+    base = base or PROC_NET_DIR
+    if not os.path.isdir(base):
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), base)
+    connections = []
+    for kind in kinds:
+        try:
+            with open(os.path.join(base, kind), 'r') as f:
+                data = f.read()
+        except FileNotFoundError:
+            continue
+        is_tcp = kind.startswith('tcp')
+        for laddr, lport, raddr, rport, state, inode in _PROC_NET_LINE.findall(data):
+            status = TCP_STATES.get(state, state) if is_tcp else 'NONE'
+            connections.append((kind, laddr, int(lport, 16), raddr, int(rport, 16), status, int(inode)))
+    return connections
+
+def decode_proc_net_address(hex_addr):
+    """Turn a /proc/net hex address (host-order 32-bit words) into an IP string"""
+    raw = bytes.fromhex(hex_addr)
+    words = b''.join(raw[i:i + 4][::-1] for i in range(0, len(raw), 4))
+    return socket.inet_ntop(socket.AF_INET if len(raw) == 4 else socket.AF_INET6, words)
+
+def resolve_socket_pids(inodes, deadline=None):
+    """Map socket inodes to owning pids by walking /proc/*/fd, stopping once all are found
+
+    Past a monotonic deadline the walk stops; unresolved sockets have no pid.
+    """
+    wanted = {f"socket:[{inode}]": inode for inode in inodes}
+    found = {}
+    if not wanted:
+        return found
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit():
+            continue
+        if deadline is not None and time.monotonic() > deadline:
+            break
+        fd_dir = f"/proc/{pid}/fd"
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            continue
+        for fd in fds:
+            try:
+                target = os.readlink(f"{fd_dir}/{fd}")
+            except OSError:
+                continue
+            inode = wanted.get(target)
+            if inode is not None and inode not in found:
+                found[inode] = int(pid)
+        if len(found) == len(wanted):
+            break
+    return found
+
+def _inet_connections():
+    """Yield (local_ip, local_port, remote_ip, remote_port, status, inode) for inet sockets"""
+    try:
+        rows = parse_proc_net()
+    except OSError:
+        # No /proc/net (non-Linux): fall back to psutil
+        for conn in psutil.net_connections(kind='inet'):
+            yield (conn.laddr.ip, conn.laddr.port,
+                   conn.raddr.ip if conn.raddr else None,
+                   conn.raddr.port if conn.raddr else None,
+                   conn.status, None)
+        return
+    for kind, laddr, lport, raddr, rport, status, inode in rows:
+        # Only a handful of rows pass the port/status filter, so addresses
+        # are decoded lazily
+        yield (lambda a=laddr: decode_proc_net_address(a), lport,
+               lambda a=raddr: decode_proc_net_address(a), rport, status, inode)
+
+def scan_network_signatures(deadline=None):
+    """Scan network connections for threat signatures (stops early past a monotonic deadline)"""
     threats = []
     
     try:
-        connections = psutil.net_connections(kind='inet')
-        
-        for conn in connections:
-            if conn.status == 'LISTEN' or conn.status == 'ESTABLISHED':
+        matched = []
+        for local_ip, local_port, remote_ip, remote_port, status, inode in _inet_connections():
+            if deadline is not None and time.monotonic() > deadline:
+                log_message("Deadline reached, network scan incomplete", "WARNING")
+                break
+            if status == 'LISTEN' or status == 'ESTABLISHED':
                 # Check for suspicious ports
-                if conn.laddr.port > 49152:  # High ports
+                if local_port > 49152:  # High ports
                     # Check for suspicious patterns
                     for sig_name, sig_data in CROSS_PLATFORM_SIGNATURES.items():
                         if 'network' in sig_name:
-                            port_str = str(conn.laddr.port)
+                            port_str = str(local_port)
                             for pattern in sig_data['patterns']:
                                 if re.search(pattern, port_str):
-                                    threats.append({
-                                        'connection': {
-                                            'local': f"{conn.laddr.ip}:{conn.laddr.port}",
-                                            'remote': f"{conn.raddr.ip}:{conn.raddr.port}" if conn.raddr else None,
-                                            'status': conn.status
-                                        },
-                                        'signature': sig_name,
-                                        'description': sig_data['description'],
-                                        'severity': sig_data['severity'],
-                                        'timestamp': datetime.now().isoformat()
-                                    })
+                                    matched.append((local_ip, local_port, remote_ip, remote_port,
+                                                    status, inode, sig_name, sig_data))
                                     break
+        
+        # Owning processes are looked up only for sockets that matched
+        pids = resolve_socket_pids({m[5] for m in matched if m[5] is not None}, deadline)
+        for local_ip, local_port, remote_ip, remote_port, status, inode, sig_name, sig_data in matched:
+            if callable(local_ip):
+                local_ip, remote_ip = local_ip(), remote_ip()
+            # Like psutil, an unconnected socket has no remote address
+            has_remote = remote_port not in (None, 0)
+            threats.append({
+                'connection': {
+                    'local': f"{local_ip}:{local_port}",
+                    'remote': f"{remote_ip}:{remote_port}" if has_remote else None,
+                    'status': status,
+                    'pid': pids.get(inode)
+                },
+                'signature': sig_name,
+                'description': sig_data['description'],
+                'severity': sig_data['severity'],
+                'timestamp': datetime.now().isoformat()
+            })
     except Exception as e:
         log_message(f"Error scanning network: {e}", "ERROR")
     
     return threats
 
+def benchmark_net_parser(count=50000, seed=1337):
+    """Time parse_proc_net on a synthetic tcp table against psutil's parser and live call"""
+    import random
+    import tempfile
+    rng = random.Random(seed)
+    header = "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n"
+    lines = [header]
+    for i in range(count):
+        laddr = rng.getrandbits(32)
+        raddr = rng.getrandbits(32)
+        state = rng.choice(['01', '01', '01', '06', '0A'])
+        lines.append(f"{i:4d}: {laddr:08X}:{rng.randrange(65536):04X} {raddr:08X}:{rng.randrange(65536):04X} "
+                     f"{state} 00000000:00000000 00:00000000 00000000  1000        0 {100000 + i} 1 "
+                     f"0000000000000000 20 4 30 10 -1\n")
+    results = {'sockets': count}
+    with tempfile.TemporaryDirectory() as base:
+        for kind in ('tcp', 'tcp6', 'udp', 'udp6'):
+            with open(os.path.join(base, kind), 'w') as f:
+                f.write(''.join(lines) if kind == 'tcp' else header)
+
+        start = time.perf_counter()
+        rows = parse_proc_net(base=base)
+        results['parse_proc_net'] = {'seconds': round(time.perf_counter() - start, 4), 'rows': len(rows)}
+
+        try:
+            from psutil._pslinux import NetConnections
+            start = time.perf_counter()
+            parsed = list(NetConnections.process_inet(
+                os.path.join(base, 'tcp'), socket.AF_INET, socket.SOCK_STREAM, {}))
+            results['psutil_process_inet'] = {'seconds': round(time.perf_counter() - start, 4), 'rows': len(parsed)}
+        except Exception as e:
+            results['psutil_process_inet'] = {'error': str(e)}
+
+    # Live host: the psutil call also walks every /proc/<pid>/fd
+    start = time.perf_counter()
+    live = psutil.net_connections(kind='inet')
+    results['live_psutil_net_connections'] = {'seconds': round(time.perf_counter() - start, 4), 'rows': len(live)}
+    try:
+        start = time.perf_counter()
+        live_rows = parse_proc_net()
+        results['live_parse_proc_net'] = {'seconds': round(time.perf_counter() - start, 4), 'rows': len(live_rows)}
+    except OSError as e:
+        results['live_parse_proc_net'] = {'error': str(e)}
+    return results
+
 # ============================================================================
 # RADAR SYSTEM
 # ============================================================================
 
+class JournalWriter:
+    """Append-only log file written in batches by a background thread.
+
+    write() only queues the line; the flush thread writes everything queued
+    with one write() call every JOURNAL_FLUSH_INTERVAL seconds (sooner once
+    JOURNAL_MAX_BATCH lines are waiting), keeps the file open between
+    batches and rotates it by size. The queue lock is only held to swap the
+    pending list; file work (write, fsync, rotation) is serialized by a
+    separate I/O lock, so writers never wait on the disk.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._pending = []
+        self._file = None
+        self._size = 0
+        self._thread = None
+        self._pid = None
+        self._closed = False
+
+    def write(self, line):
+        with self._cond:
+            # The flush thread does not survive os.fork() (--daemon)
+            if self._pid != os.getpid():
+                self._start()
+            self._pending.append(line)
+            if JOURNAL_FSYNC != 'always' and len(self._pending) >= JOURNAL_MAX_BATCH:
+                self._cond.notify()
+        if JOURNAL_FSYNC == 'always':
+            self.flush()
+
+    def _start(self):
+        self._pid = os.getpid()
+        # A lock held by another thread at fork time would never be released
+        self._io_lock = threading.Lock()
+        self._file = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='radar-journal', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                self._cond.wait(JOURNAL_FLUSH_INTERVAL)
+                if self._closed:
+                    return
+            self.flush()
+
+    def flush(self):
+        """Write everything queued so far; returns once it is on disk"""
+        with self._io_lock:
+            with self._cond:
+                if not self._pending:
+                    return
+                data = ''.join(self._pending)
+                self._pending = []
+            self._write_batch(data.encode('utf-8'))
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        with self._io_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _open(self):
+        self._file = open(self.path, 'ab')
+        self._size = self._file.tell()
+
+    def _write_batch(self, data):
+        # Called with _io_lock held
+        try:
+            # Reopen if the file was removed or rotated by someone else
+            if self._file is not None:
+                try:
+                    if os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino:
+                        self._file.close()
+                        self._file = None
+                except OSError:
+                    self._file.close()
+                    self._file = None
+            if self._file is None:
+                self._open()
+            if JOURNAL_MAX_BYTES and self._size + len(data) > JOURNAL_MAX_BYTES and self._size > 0:
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+            self._size = self._file.tell()
+            if JOURNAL_FSYNC in ('batch', 'always'):
+                os.fsync(self._file.fileno())
+        except Exception as e:
+            print(f"Log error ({self.path}): {e}")
+
+    def _segment(self, index):
+        suffix = '.gz' if JOURNAL_COMPRESS else ''
+        return f"{self.path}.{index}{suffix}"
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        if JOURNAL_BACKUPS > 0:
+            for index in range(JOURNAL_BACKUPS - 1, 0, -1):
+                if os.path.exists(self._segment(index)):
+                    os.replace(self._segment(index), self._segment(index + 1))
+            if JOURNAL_COMPRESS:
+                with open(self.path, 'rb') as src, gzip.open(self._segment(1), 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self._segment(1))
+        else:
+            os.remove(self.path)
+        self._open()
+
+
+_journals = {}
+_journals_lock = threading.Lock()
+
+def get_journal(path):
+    """Return the shared JournalWriter for path"""
+    with _journals_lock:
+        journal = _journals.get(path)
+        if journal is None:
+            journal = _journals[path] = JournalWriter(path)
+        return journal
+
+@atexit.register
+def flush_journals():
+    with _journals_lock:
+        journals = list(_journals.values())
+    for journal in journals:
+        journal.close()
+
 def log_message(message, level="INFO"):
     """Log message to file"""
     timestamp = datetime.now().isoformat()
     log_entry = f"[{timestamp}] [{level}] {message}\n"
-    
-    try:
-        with open(RADAR_LOG, 'a') as f:
-            f.write(log_entry)
-    except Exception as e:
-        print(f"Log error: {e}")
+    get_journal(RADAR_LOG).write(log_entry)
 
 def log_threat(threat_data):
     """Log threat to threat log"""
     try:
-        with open(THREAT_LOG, 'a') as f:
-            f.write(json.dumps(threat_data) + '\n')
+        line = json.dumps(threat_data) + '\n'
     except Exception as e:
         log_message(f"Error logging threat: {e}", "ERROR")
+        return
+    get_journal(THREAT_LOG).write(line)
 
 def save_status(status):
     """Save radar status"""
@@ -438,51 +2440,569 @@ def save_status(status):
     except Exception as e:
         log_message(f"Error saving status: {e}", "ERROR")
 
-def radar_scan():
-    """Perform full radar scan"""
-    log_message("══════════════════════════════════════════════════════════════", "INFO")
-    log_message("SIGNATURE RADAR - FULL SCAN", "INFO")
-    log_message("══════════════════════════════════════════════════════════════", "INFO")
-    
-    all_threats = []
-    
-    # Scan processes
+# ============================================================================
+# METRICS
+# ============================================================================
+
+class MetricsRegistry:
+    """Counters, gauges and histograms rendered in Prometheus text format.
+
+    Metrics are declared once with describe(); labels are passed to
+    inc/set/observe as keyword arguments.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta = {}
+        self._values = {}
+
+    def describe(self, name, kind, help_text, buckets=None, labelled=False):
+        with self._lock:
+            self._meta[name] = (kind, help_text, tuple(buckets) if buckets else None)
+            values = self._values.setdefault(name, {})
+            # Unlabelled counters are exported as 0 before their first increment
+            if kind == 'counter' and not labelled:
+                values.setdefault((), 0)
+
+    def inc(self, name, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            values = self._values[name]
+            values[key] = values.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._values[name][tuple(sorted(labels.items()))] = value
+
+    def get(self, name, default=None, **labels):
+        with self._lock:
+            return self._values[name].get(tuple(sorted(labels.items())), default)
+
+    def observe(self, name, value, **labels):
+        key = tuple(sorted(labels.items()))
+        buckets = self._meta[name][2]
+        with self._lock:
+            values = self._values[name]
+            if key not in values:
+                values[key] = [[0] * len(buckets), 0.0, 0]
+            state = values[key]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    @staticmethod
+    def _labels(key, extra=()):
+        pairs = list(key) + list(extra)
+        if not pairs:
+            return ''
+        escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+        return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+    @staticmethod
+    def _number(value):
+        if isinstance(value, float) and value == float('inf'):
+            return '+Inf'
+        return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, buckets) in self._meta.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in sorted(self._values[name].items()):
+                    if kind != 'histogram':
+                        lines.append(f"{name}{self._labels(key)} {self._number(value)}")
+                        continue
+                    counts, total, count = value
+                    for bound, bucket_count in zip(buckets, counts):
+                        lines.append(f"{name}_bucket{self._labels(key, [('le', self._number(float(bound)))])} {bucket_count}")
+                    lines.append(f"{name}_bucket{self._labels(key, [('le', '+Inf')])} {count}")
+                    lines.append(f"{name}_sum{self._labels(key)} {self._number(float(total))}")
+                    lines.append(f"{name}_count{self._labels(key)} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = MetricsRegistry()
+for _name, _kind, _help, _buckets, _labelled in [
+    ('radar_cycles_total', 'counter', 'Radar scan cycles completed', None, False),
+    ('radar_cycle_duration_seconds', 'histogram', 'Wall time of a radar scan cycle', METRICS_DURATION_BUCKETS, False),
+    ('radar_cycle_overruns_total', 'counter', 'Cycles that took longer than the scan interval', None, False),
+    ('radar_scan_interval_seconds', 'gauge', 'Configured scan interval', None, False),
+    ('radar_last_scan_timestamp_seconds', 'gauge', 'Unix time of the last completed cycle', None, False),
+    ('radar_phase_duration_seconds', 'histogram', 'Wall time of a radar phase', METRICS_DURATION_BUCKETS, True),
+    ('radar_phase_timeouts_total', 'counter', 'Phases that stopped early at their deadline', None, True),
+    ('radar_phase_overruns_total', 'counter', 'Phases whose results were skipped for missing the deadline', None, True),
+    ('radar_files_scanned_total', 'counter', 'Files evaluated or served from the scan cache', None, False),
+    ('radar_scan_cache_hits_total', 'counter', 'Files whose cached verdict was reused', None, False),
+    ('radar_scan_cache_hit_ratio', 'gauge', 'Scan cache hit ratio of the last cycle', None, False),
+    ('radar_files_hashed_total', 'counter', 'Files hashed', None, False),
+    ('radar_bytes_hashed_total', 'counter', 'Bytes hashed', None, False),
+    ('radar_content_bytes_scanned_total', 'counter', 'Bytes searched for content signatures', None, False),
+    ('radar_processes_evaluated_total', 'counter', 'Processes matched against signatures', None, False),
+    ('radar_threats', 'gauge', 'Threats found in the last cycle', None, True),
+    ('radar_threats_detected_total', 'counter', 'Threats found, summed over cycles', None, True),
+    ('radar_threat_transitions_total', 'counter', 'Threat state transitions', None, True),
+    ('radar_governor_throttled_seconds', 'gauge', 'Seconds slept by the resource governor since start', None, False),
+]:
+    METRICS.describe(_name, _kind, _help, _buckets, _labelled)
+
+def record_cycle_metrics(status):
+    """Fold one cycle's status into the metrics registry"""
+    METRICS.inc('radar_cycles_total')
+    METRICS.observe('radar_cycle_duration_seconds', status['cycle_seconds'])
+    METRICS.set('radar_last_scan_timestamp_seconds', time.time())
+    interval = METRICS.get('radar_scan_interval_seconds')
+    if interval and status['cycle_seconds'] > interval:
+        METRICS.inc('radar_cycle_overruns_total')
+
+    for phase, phase_status in status['phases'].items():
+        if phase_status.get('overrun'):
+            METRICS.inc('radar_phase_overruns_total', phase=phase)
+            continue
+        METRICS.observe('radar_phase_duration_seconds', phase_status['wall_seconds'], phase=phase)
+        if phase_status['timed_out']:
+            METRICS.inc('radar_phase_timeouts_total', phase=phase)
+
+    cache = status['scan_cache']
+    files = cache['hits'] + cache['re_evaluated']
+    METRICS.inc('radar_files_scanned_total', files)
+    METRICS.inc('radar_scan_cache_hits_total', cache['hits'])
+    if files:
+        METRICS.set('radar_scan_cache_hit_ratio', cache['hits'] / files)
+    METRICS.inc('radar_files_hashed_total', status['hashing']['files_hashed'])
+    METRICS.inc('radar_bytes_hashed_total', status['hashing']['bytes_hashed'])
+    METRICS.inc('radar_content_bytes_scanned_total', status['content_scan']['bytes_scanned'])
+    METRICS.inc('radar_processes_evaluated_total', status['process_cache']['evaluated'])
+
+    for severity, count in status['threats_by_severity'].items():
+        METRICS.set('radar_threats', count, severity=severity)
+        METRICS.inc('radar_threats_detected_total', count, severity=severity)
+    for transition in ('new', 'escalated', 'resolved'):
+        METRICS.inc('radar_threat_transitions_total', status['threat_state'][transition], transition=transition)
+    METRICS.set('radar_governor_throttled_seconds', status['governor']['throttled_seconds'])
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = METRICS.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        return str(self.client_address[0]) if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _UnixMetricsServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ('unix', 0)
+
+
+def start_metrics_server(address):
+    """Serve METRICS at address ('host:port', ':port' or 'unix:/path') from a daemon thread"""
+    if address.startswith('unix:'):
+        path = address[len('unix:'):]
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        server = _UnixMetricsServer(path, _MetricsHandler)
+        os.chmod(path, 0o660)
+    else:
+        host, _, port = address.rpartition(':')
+        server = http.server.ThreadingHTTPServer((host or '127.0.0.1', int(port)), _MetricsHandler)
+        server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='radar-metrics', daemon=True)
+    thread.start()
+    log_message(f"Metrics endpoint listening on {address}", "INFO")
+    return server
+
+# ============================================================================
+# THREAT STATE
+# ============================================================================
+
+SEVERITY_RANK = {'LOW': 1, 'MEDIUM': 2, 'HIGH': 3, 'CRITICAL': 4}
+
+def threat_identity(threat):
+    """Stable identity of the object a threat was raised on"""
+    if 'file' in threat:
+        return f"file:{threat['file']}"
+    if 'pid' in threat:
+        return f"proc:{threat['pid']}:{threat.get('create_time', threat.get('name', ''))}"
+    if 'connection' in threat:
+        conn = threat['connection']
+        return f"net:{conn.get('local')}->{conn.get('remote')}:{conn.get('status')}"
+    return 'other:' + json.dumps({k: v for k, v in threat.items() if k != 'timestamp'}, sort_keys=True)
+
+
+class ThreatStateStore:
+    """Open threats keyed by (signature, object identity), persisted in SQLite.
+
+    observe() folds one scan's threats into the table and returns only the
+    transitions: 'new' the first time a key is seen, 'escalated' when its
+    severity rises, and 'resolved' once every scope that reported it has
+    completed a scan without seeing it again.
+    """
+
+    def __init__(self, db_path=THREAT_STATE_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._open = None
+
+    def _load(self):
+        self._open = {}
+        try:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS open_threats ("
+                " signature TEXT, identity TEXT, severity TEXT, first_seen TEXT,"
+                " last_seen TEXT, hit_count INTEGER, scopes TEXT, threat TEXT,"
+                " PRIMARY KEY (signature, identity))")
+            for row in self._conn.execute("SELECT * FROM open_threats"):
+                signature, identity, severity, first_seen, last_seen, hit_count, scopes, threat = row
+                self._open[(signature, identity)] = {
+                    'severity': severity,
+                    'first_seen': first_seen,
+                    'last_seen': last_seen,
+                    'hit_count': hit_count,
+                    'scopes': set(scopes.split(',')) if scopes else set(),
+                    'threat': json.loads(threat)
+                }
+        except sqlite3.Error as e:
+            log_message(f"Threat state DB unavailable ({self.db_path}): {e}", "ERROR")
+            self._conn = None
+
+    def observe(self, scope, threats, complete=True, covered=None):
+        """Record threats seen by scope and return [(transition, threat)].
+
+        complete means scope looked at everything it covers, so its open
+        threats that were not seen are resolved. For partial scans, pass
+        covered (a set of identities) to resolve only within it.
+        """
+        now = datetime.now().isoformat()
+        transitions = []
+        with self._lock:
+            if self._open is None:
+                self._load()
+            seen = set()
+            changed = {}
+            for threat in threats:
+                key = (threat.get('signature', 'unknown'), threat_identity(threat))
+                if key in seen:
+                    continue
+                seen.add(key)
+                state = self._open.get(key)
+                severity = threat.get('severity', 'UNKNOWN')
+                if state is None:
+                    state = self._open[key] = {
+                        'severity': severity,
+                        'first_seen': threat.get('timestamp', now),
+                        'last_seen': now,
+                        'hit_count': 1,
+                        'scopes': {scope},
+                        'threat': threat
+                    }
+                    transitions.append(('new', key, state))
+                else:
+                    escalated = SEVERITY_RANK.get(severity, 0) > SEVERITY_RANK.get(state['severity'], 0)
+                    state.update(last_seen=now, hit_count=state['hit_count'] + 1, threat=threat)
+                    state['scopes'].add(scope)
+                    if escalated:
+                        state['severity'] = severity
+                        transitions.append(('escalated', key, state))
+                changed[key] = state
+
+            resolved = []
+            if complete or covered:
+                for key, state in self._open.items():
+                    if key in seen or scope not in state['scopes']:
+                        continue
+                    if not complete and key[1] not in covered:
+                        continue
+                    state['scopes'].discard(scope)
+                    if state['scopes']:
+                        changed[key] = state
+                    else:
+                        resolved.append(key)
+                        transitions.append(('resolved', key, state))
+            for key in resolved:
+                del self._open[key]
+                changed.pop(key, None)
+            self._persist(changed, resolved)
+
+        return [(transition, dict(state['threat'],
+                                  state=transition,
+                                  severity=state['severity'],
+                                  first_seen=state['first_seen'],
+                                  last_seen=state['last_seen'],
+                                  hit_count=state['hit_count']))
+                for transition, key, state in transitions]
+
+    def _persist(self, changed, resolved):
+        if self._conn is None:
+            return
+        try:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO open_threats VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(key[0], key[1], state['severity'], state['first_seen'], state['last_seen'],
+                      state['hit_count'], ','.join(sorted(state['scopes'])), json.dumps(state['threat']))
+                     for key, state in changed.items()])
+                self._conn.executemany(
+                    "DELETE FROM open_threats WHERE signature = ? AND identity = ?", resolved)
+        except sqlite3.Error as e:
+            log_message(f"Error writing threat state: {e}", "ERROR")
+
+    def open_threats(self, min_severity=None):
+        """Return the currently open threats, most severe first"""
+        with self._lock:
+            if self._open is None:
+                self._load()
+            states = list(self._open.values())
+        floor = SEVERITY_RANK.get(min_severity, 0)
+        result = [dict(state['threat'],
+                       severity=state['severity'],
+                       first_seen=state['first_seen'],
+                       last_seen=state['last_seen'],
+                       hit_count=state['hit_count'])
+                  for state in states if SEVERITY_RANK.get(state['severity'], 0) >= floor]
+        result.sort(key=lambda t: (-SEVERITY_RANK.get(t['severity'], 0), t['first_seen']))
+        return result
+
+    def counts(self):
+        with self._lock:
+            if self._open is None:
+                self._load()
+            by_severity = {}
+            for state in self._open.values():
+                by_severity[state['severity']] = by_severity.get(state['severity'], 0) + 1
+            return {'open': len(self._open), 'open_by_severity': by_severity}
+
+
+THREAT_STATE = ThreatStateStore()
+
+def _phase_processes(deadline):
     log_message("[1] Scanning processes for signatures...", "INFO")
-    process_threats = scan_process_signatures()
-    all_threats.extend(process_threats)
-    log_message(f"   Found {len(process_threats)} process threats", "INFO")
-    
-    # Scan removable devices
+    threats = scan_process_signatures(deadline)
+    log_message(f"   Found {len(threats)} process threats", "INFO")
+    return threats, {}
+
+def _phase_removable_devices(deadline):
     log_message("[2] Scanning removable devices...", "INFO")
     removable_devices = detect_removable_devices()
     log_message(f"   Found {len(removable_devices)} removable devices", "INFO")
     
-    for device in removable_devices:
-        if 'mountpoint' in device:
-            device_threats = scan_removable_device(device['mountpoint'])
-            all_threats.extend(device_threats)
-            log_message(f"   Scanned {device['mountpoint']}: {len(device_threats)} threats", "INFO")
-    
-    # Scan network
+    # Slow media no longer hold up fast media: each block device gets its own worker
+    mountpoints = [device['mountpoint'] for device in removable_devices if 'mountpoint' in device]
+    threats, device_stats = scan_removable_devices(mountpoints, deadline=deadline)
+    for stats in device_stats:
+        log_message(f"   Scanned {stats['mountpoint']} ({stats['block_device']}): {stats['threats']} threats, "
+                    f"{stats.get('files', 0)} files in {stats['seconds']}s", "INFO")
+    return threats, {
+        'removable_devices': len(removable_devices),
+        'roots': mountpoints,
+        'devices': device_stats
+    }
+
+def _phase_network(deadline):
     log_message("[3] Scanning network connections...", "INFO")
-    network_threats = scan_network_signatures()
-    all_threats.extend(network_threats)
-    log_message(f"   Found {len(network_threats)} network threats", "INFO")
-    
-    # Scan critical files
+    threats = scan_network_signatures(deadline)
+    log_message(f"   Found {len(threats)} network threats", "INFO")
+    return threats, {}
+
+def _phase_critical_files(deadline):
     log_message("[4] Scanning critical files...", "INFO")
-    file_threats = scan_file_signatures(max_depth=2)
-    all_threats.extend(file_threats)
-    log_message(f"   Found {len(file_threats)} file threats", "INFO")
-    
-    # Log all threats
-    for threat in all_threats:
+    threats = scan_file_signatures(max_depth=CRITICAL_FILE_DEPTH, deadline=deadline)
+    log_message(f"   Found {len(threats)} file threats", "INFO")
+    return threats, {'roots': FILE_SCAN_DIRS}
+
+# Phase order is also the order threats are returned in
+RADAR_PHASES = [
+    ('processes', _phase_processes),
+    ('removable_devices', _phase_removable_devices),
+    ('network', _phase_network),
+    ('critical_files', _phase_critical_files)
+]
+
+_phase_executor = None
+_phase_executor_lock = threading.Lock()
+
+def _get_phase_executor():
+    global _phase_executor
+    with _phase_executor_lock:
+        if _phase_executor is None:
+            _phase_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=RADAR_PHASE_WORKERS, thread_name_prefix='radar-phase')
+        return _phase_executor
+
+def _run_phase(name, phase, deadline):
+    """Run one phase, returning its threats plus wall and CPU timings"""
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    result = {'threats': [], 'extra': {}, 'error': None}
+    try:
+        result['threats'], result['extra'] = phase(deadline)
+    except Exception as e:
+        result['error'] = str(e)
+        log_message(f"Error in radar phase {name}: {e}", "ERROR")
+    result['wall_seconds'] = round(time.perf_counter() - wall_start, 3)
+    result['cpu_seconds'] = round(time.thread_time() - cpu_start, 3)
+    result['timed_out'] = deadline is not None and time.monotonic() > deadline
+    return result
+
+def phase_deadlines(interval=None):
+    """Return ({phase: deadline seconds}, grace seconds) scaled to a monitor interval
+
+    Without an interval (one-shot scan) every phase gets RADAR_ONESHOT_DEADLINE,
+    None meaning no deadline.
+    """
+    if interval is None:
+        return {name: RADAR_ONESHOT_DEADLINE for name, _ in RADAR_PHASES}, RADAR_PHASE_GRACE
+    scale = (interval or RADAR_PHASE_BASE_INTERVAL) / RADAR_PHASE_BASE_INTERVAL
+    deadlines = {name: RADAR_PHASE_DEADLINES.get(name, RADAR_PHASE_BASE_INTERVAL) * scale
+                 for name, _ in RADAR_PHASES}
+    return deadlines, RADAR_PHASE_GRACE * scale
+
+def _round_deadline(seconds):
+    return None if seconds is None else round(seconds, 3)
+
+# Phases that overran a cycle, by name: future of the still-running phase
+_overrun_phases = {}
+
+def _collect_overrun_phases(grace):
+    """Wait up to grace seconds for phases left running by an earlier cycle.
+
+    Their threats are reported (they cannot resolve anything, having missed
+    their cycle). Returns the names still running, which must not be
+    started again this cycle.
+    """
+    if not _overrun_phases:
+        return set()
+    concurrent.futures.wait(list(_overrun_phases.values()), timeout=grace)
+    for name, future in list(_overrun_phases.items()):
+        if future.done():
+            del _overrun_phases[name]
+            result = future.result()
+            log_message(f"Radar phase {name} from an earlier cycle finished late "
+                        f"({result['wall_seconds']}s, {len(result['threats'])} threats)", "WARNING")
+            _report_threats(name, result['threats'], complete=False)
+    return set(_overrun_phases)
+
+def _report_threats(scope, threats, complete=True, covered=None):
+    """Fold threats into THREAT_STATE and log only the state transitions"""
+    for transition, threat in THREAT_STATE.observe(scope, threats, complete, covered):
+        SCAN_COUNTERS.add(f'threats_{transition}')
         log_threat(threat)
-        log_message(f"THREAT DETECTED: {threat.get('signature', 'unknown')} - {threat.get('description', '')} - Severity: {threat.get('severity', 'UNKNOWN')}", "WARNING")
+        if transition == 'resolved':
+            log_message(f"THREAT RESOLVED: {threat.get('signature', 'unknown')} - {threat_identity(threat)} - seen {threat['hit_count']} times", "INFO")
+        else:
+            log_message(f"THREAT {'DETECTED' if transition == 'new' else 'ESCALATED'}: {threat.get('signature', 'unknown')} - {threat.get('description', '')} - Severity: {threat.get('severity', 'UNKNOWN')}", "WARNING")
+
+def radar_scan(phases=None, interval=None):
+    """Perform full radar scan, or only the named phases
+
+    Phase deadlines are scaled to interval (the monitor's scan interval);
+    a one-shot scan (no interval) is only bounded by RADAR_ONESHOT_DEADLINE.
+    """
+    log_message("══════════════════════════════════════════════════════════════", "INFO")
+    log_message("SIGNATURE RADAR - FULL SCAN" if phases is None else
+                f"SIGNATURE RADAR - SCAN ({', '.join(phases)})", "INFO")
+    log_message("══════════════════════════════════════════════════════════════", "INFO")
+    
+    selected = [(name, phase) for name, phase in RADAR_PHASES if phases is None or name in phases]
+    deadlines, grace = phase_deadlines(interval)
+    # A phase from the previous cycle would mix its counts into this one
+    # and hold a worker; wait for it briefly, else skip it this cycle
+    still_running = _collect_overrun_phases(grace)
+    for name in still_running:
+        log_message(f"Radar phase {name} is still running from an earlier cycle; skipped this cycle", "WARNING")
+    refresh_signatures()
+    SCAN_COUNTERS.reset()
+    SCAN_CACHE.begin_cycle()
+    
+    # Run all phases concurrently; each phase's threats are reported as soon
+    # as it finishes, so a slow file walk does not hold back the others
+    cycle_start = time.monotonic()
+    executor = _get_phase_executor()
+    pending = {}
+    for name, phase in selected:
+        if name in still_running:
+            continue
+        if deadlines[name] is None:
+            deadline, give_up = None, float('inf')
+        else:
+            deadline = cycle_start + deadlines[name]
+            give_up = deadline + grace
+        pending[executor.submit(_run_phase, name, phase, deadline)] = (name, give_up)
+    
+    results = {}
+    while pending:
+        cutoff = min(give_up for _, give_up in pending.values())
+        done, _ = concurrent.futures.wait(
+            pending, timeout=None if cutoff == float('inf') else max(0, cutoff - time.monotonic()),
+            return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            name, _ = pending.pop(future)
+            result = results[name] = future.result()
+            # Only a phase that covered all of its roots may resolve threats
+            truncated = {t['root'] for t in SCAN_COUNTERS.get('truncated_roots', [])}
+            complete = not result['timed_out'] and result['error'] is None and \
+                not truncated.intersection(result['extra'].get('roots', []))
+            _report_threats(name, result['threats'], complete)
+        now = time.monotonic()
+        for future, (name, give_up) in list(pending.items()):
+            if now >= give_up:
+                del pending[future]
+                _overrun_phases[name] = future
+                log_message(f"Radar phase {name} overran its deadline; its results will be reported "
+                            f"when it finishes", "WARNING")
+    
+    all_threats = []
+    phase_status = {}
+    removable_devices = 0
+    device_stats = []
+    for name, _ in selected:
+        result = results.get(name)
+        if result is None:
+            phase_status[name] = {'deadline': _round_deadline(deadlines[name]), 'overrun': True,
+                                  'skipped': name in still_running}
+            continue
+        all_threats.extend(result['threats'])
+        removable_devices = result['extra'].get('removable_devices', removable_devices)
+        device_stats = result['extra'].get('devices', device_stats)
+        phase_status[name] = {
+            'wall_seconds': result['wall_seconds'],
+            'cpu_seconds': result['cpu_seconds'],
+            'threats': len(result['threats']),
+            'deadline': _round_deadline(deadlines[name]),
+            'timed_out': result['timed_out'],
+            'error': result['error']
+        }
+    
+    SCAN_CACHE.end_cycle()
+    cache_hits = SCAN_COUNTERS.get('cache_hits')
+    cache_reevaluated = SCAN_COUNTERS.get('cache_reevaluated')
+    log_message(f"   Scan cache: {cache_hits} unchanged, {cache_reevaluated} re-evaluated", "INFO")
     
     # Save status
     status = {
         'last_scan': datetime.now().isoformat(),
+        'cycle_seconds': round(time.monotonic() - cycle_start, 3),
         'threats_found': len(all_threats),
         'threats_by_severity': {
             'CRITICAL': len([t for t in all_threats if t.get('severity') == 'CRITICAL']),
@@ -490,10 +3010,34 @@ def radar_scan():
             'MEDIUM': len([t for t in all_threats if t.get('severity') == 'MEDIUM']),
             'LOW': len([t for t in all_threats if t.get('severity') == 'LOW'])
         },
-        'removable_devices': len(removable_devices),
+        'removable_devices': removable_devices,
+        'devices': device_stats,
+        'phases': phase_status,
+        'truncated_roots': SCAN_COUNTERS.get('truncated_roots', []),
+        'process_cache': {
+            'hits': SCAN_COUNTERS.get('process_cache_hits'),
+            'evaluated': SCAN_COUNTERS.get('process_evaluated'),
+            'entries': len(PROCESS_VERDICTS)
+        },
+        'threat_state': dict(THREAT_STATE.counts(),
+                             new=SCAN_COUNTERS.get('threats_new'),
+                             escalated=SCAN_COUNTERS.get('threats_escalated'),
+                             resolved=SCAN_COUNTERS.get('threats_resolved')),
+        'signature_pack': signature_pack_status(),
+        'hashing': hashing_status(),
+        'content_scan': content_status(),
+        'governor': GOVERNOR.status(),
+        'scan_cache': {
+            'hits': cache_hits,
+            're_evaluated': cache_reevaluated,
+            'entries': len(SCAN_CACHE)
+        },
         'running': True
     }
+    if EVENT_MODE_STATUS:
+        status['event_mode'] = dict(EVENT_MODE_STATUS)
     save_status(status)
+    record_cycle_metrics(status)
     
     log_message(f"✅ Scan complete: {len(all_threats)} threats detected", "INFO")
     log_message("", "INFO")
@@ -507,10 +3051,11 @@ def radar_monitor(interval=30):
     log_message("══════════════════════════════════════════════════════════════", "INFO")
     log_message(f"Scan interval: {interval} seconds", "INFO")
     log_message("", "INFO")
+    METRICS.set('radar_scan_interval_seconds', interval)
     
     while True:
         try:
-            radar_scan()
+            radar_scan(interval=interval)
             time.sleep(interval)
         except KeyboardInterrupt:
             log_message("RADAR MONITORING STOPPED BY USER", "INFO")
@@ -519,22 +3064,313 @@ def radar_monitor(interval=30):
             log_message(f"Error in radar monitoring: {e}", "ERROR")
             time.sleep(interval)
 
+# ============================================================================
+# EVENT-DRIVEN MODE (INOTIFY)
+# ============================================================================
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | \
+    IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW
+
+_INOTIFY_EVENT = struct.Struct('iIII')
+
+# Status of the event loop, included in the status file while it runs
+EVENT_MODE_STATUS = {}
+
+
+class InotifyWatcher:
+    """Depth-bounded recursive inotify watches through libc (ctypes).
+
+    Directories that cannot be watched because the per-user watch limit is
+    exhausted (ENOSPC) are recorded in self.polled and left to polling.
+    """
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError("inotify is not available on this platform")
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self._libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        # wd -> (directory, remaining depth below it)
+        self.watches = {}
+        self._paths = {}
+        # directory -> remaining depth, for subtrees that fell back to polling
+        self.polled = {}
+
+    def close(self):
+        os.close(self.fd)
+
+    def _add(self, directory, depth):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                if directory not in self.polled:
+                    log_message(f"inotify watch limit reached; polling {directory}", "WARNING")
+                self.polled[directory] = depth
+            return False
+        self.watches[wd] = (directory, depth)
+        self._paths[directory] = wd
+        return True
+
+    def watch_tree(self, root, depth):
+        """Watch root and its subdirectories down to depth levels below it"""
+        if root in self._paths or root in self.polled:
+            return
+        if not self._add(root, depth) or depth <= 0:
+            return
+        try:
+            with os.scandir(root) as it:
+                subdirs = [entry.path for entry in it if entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            return
+        for subdir in subdirs:
+            self.watch_tree(subdir, depth - 1)
+
+    def read_events(self, timeout):
+        """Return [(path, mask)] for events arriving within timeout seconds"""
+        ready, _, _ = select.select([self.fd], [], [], max(0, timeout))
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 256 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + _INOTIFY_EVENT.size <= len(data):
+            wd, mask, _, name_len = _INOTIFY_EVENT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT.size
+            name = data[offset:offset + name_len].split(b'\0', 1)[0]
+            offset += name_len
+            if mask & IN_Q_OVERFLOW:
+                events.append((None, mask))
+                continue
+            watch = self.watches.get(wd)
+            if watch is None:
+                continue
+            directory, depth = watch
+            if mask & IN_IGNORED:
+                del self.watches[wd]
+                self._paths.pop(directory, None)
+                continue
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+            if name and mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and depth > 0:
+                self.watch_tree(path, depth - 1)
+            events.append((path, mask))
+        return events
+
+
+def radar_event_monitor(interval=30, full_rescan_interval=EVENT_FULL_RESCAN_INTERVAL):
+    """Event-driven radar: inotify for files, periodic scans for everything else"""
+    log_message("══════════════════════════════════════════════════════════════", "INFO")
+    log_message("SIGNATURE RADAR - EVENT-DRIVEN MONITORING", "INFO")
+    log_message("══════════════════════════════════════════════════════════════", "INFO")
+    
+    try:
+        watcher = InotifyWatcher()
+    except OSError as e:
+        log_message(f"inotify unavailable ({e}); falling back to polling", "WARNING")
+        return radar_monitor(interval)
+    
+    def resync():
+        for scan_dir in FILE_SCAN_DIRS:
+            if os.path.isdir(scan_dir):
+                watcher.watch_tree(scan_dir, CRITICAL_FILE_DEPTH)
+        EVENT_MODE_STATUS.update({
+            'watches': len(watcher.watches),
+            'polled_subtrees': sorted(watcher.polled)
+        })
+    
+    resync()
+    log_message(f"Watching {len(watcher.watches)} directories, polling {len(watcher.polled)} subtrees", "INFO")
+    log_message(f"Process/network interval: {interval}s, full rescan every {full_rescan_interval}s", "INFO")
+    METRICS.set('radar_scan_interval_seconds', interval)
+    
+    EVENT_MODE_STATUS.update({'events': 0, 'files_evaluated': 0})
+    radar_scan(interval=interval)
+    next_periodic = time.monotonic() + interval
+    next_full = time.monotonic() + full_rescan_interval
+    changed = set()
+    oldest_change = None
+    
+    try:
+        while True:
+            try:
+                now = time.monotonic()
+                timeout = min(next_periodic, next_full) - now
+                if changed:
+                    timeout = min(timeout, EVENT_BATCH_SECONDS, oldest_change + EVENT_MAX_BATCH_AGE - now)
+                events = watcher.read_events(max(0, timeout))
+                overflow = False
+                for path, mask in events:
+                    if path is None:
+                        overflow = True
+                    elif not mask & IN_ISDIR:
+                        changed.add(path)
+                    elif mask & (IN_CREATE | IN_MOVED_TO):
+                        # Files may land in a new directory before its watch exists
+                        changed.update(entry.path for entry in BoundedWalk(path, max_files=10000))
+                EVENT_MODE_STATUS['events'] += len(events)
+                
+                now = time.monotonic()
+                if changed and oldest_change is None:
+                    oldest_change = now
+                if refresh_signatures():
+                    # Cached verdicts were dropped; re-evaluate everything
+                    next_full = now
+                if overflow or now >= next_full:
+                    if overflow:
+                        log_message("inotify queue overflow; running full rescan", "WARNING")
+                    changed.clear()
+                    oldest_change = None
+                    resync()
+                    radar_scan(interval=interval)
+                    next_full = time.monotonic() + full_rescan_interval
+                    next_periodic = time.monotonic() + interval
+                    continue
+                
+                if changed and (not events or now - oldest_change >= EVENT_MAX_BATCH_AGE):
+                    # Event burst is over (or has gone on too long): evaluate what changed
+                    threats = []
+                    for path in sorted(changed):
+                        if os.path.isfile(path):
+                            threats.extend(scan_critical_file(path))
+                    EVENT_MODE_STATUS['files_evaluated'] += len(changed)
+                    covered = {f"file:{path}" for path in changed}
+                    changed.clear()
+                    oldest_change = None
+                    _report_threats('critical_files', threats, complete=False, covered=covered)
+                
+                if now >= next_periodic:
+                    radar_scan(phases=['processes', 'removable_devices', 'network'], interval=interval)
+                    for directory, depth in list(watcher.polled.items()):
+                        _report_threats('critical_files',
+                                        scan_file_signatures(max_depth=depth, scan_dirs=[directory]),
+                                        complete=False)
+                    next_periodic = time.monotonic() + interval
+            except KeyboardInterrupt:
+                raise
+            except Exception as e:
+                log_message(f"Error in event monitoring: {e}", "ERROR")
+                time.sleep(1)
+    except KeyboardInterrupt:
+        log_message("RADAR MONITORING STOPPED BY USER", "INFO")
+    finally:
+        watcher.close()
+
 # ============================================================================
 # MAIN
 # ============================================================================
 
+def run_monitor(args):
+    if METRICS_ADDRESS:
+        start_metrics_server(METRICS_ADDRESS)
+    if args.events:
+        radar_event_monitor(args.interval, args.full_rescan_interval)
+    else:
+        radar_monitor(args.interval)
+
 def main():
     import argparse
+    global HASH_MAX_BYTES, HASH_USE_MMAP, HASH_WORKERS, HASH_POOL_KIND
+    global CONTENT_SCAN_ENABLED, CONTENT_SCAN_MAX_BYTES
+    global GOVERNOR_MAX_BYTES_PER_SECOND, GOVERNOR_MAX_FILES_PER_SECOND, GOVERNOR_CPU_SHARE
+    global GOVERNOR_LOAD_HIGH, GOVERNOR_LOAD_CPU_SHARE, GOVERNOR_IO_IDLE, METRICS_ADDRESS
+    global RADAR_ONESHOT_DEADLINE
     
     parser = argparse.ArgumentParser(description='SIGNATURE RADAR - Cross-Platform Threat Detection')
     parser.add_argument('--scan', action='store_true', help='Run single scan')
     parser.add_argument('--monitor', action='store_true', help='Run continuous monitoring')
     parser.add_argument('--interval', type=int, default=30, help='Scan interval in seconds (default: 30)')
     parser.add_argument('--daemon', action='store_true', help='Run as daemon')
+    parser.add_argument('--events', action='store_true',
+                        help='With --monitor: evaluate files on inotify events instead of rescanning them every interval')
+    parser.add_argument('--full-rescan-interval', type=int, default=EVENT_FULL_RESCAN_INTERVAL,
+                        help=f'Event mode: full rescan safety net in seconds (default: {EVENT_FULL_RESCAN_INTERVAL})')
+    parser.add_argument('--hash-max-mb', type=int, default=HASH_MAX_BYTES // (1024 * 1024),
+                        help='Skip hashing files larger than this many MB (0 = no limit)')
+    parser.add_argument('--benchmark-matcher', type=int, metavar='N', nargs='?', const=1000000,
+                        help='Benchmark the compiled signature matcher on N synthetic names (default: 1M)')
+    parser.add_argument('--benchmark-netparse', type=int, metavar='N', nargs='?', const=50000,
+                        help='Benchmark the /proc/net parser on N synthetic sockets (default: 50k)')
+    parser.add_argument('--benchmark-content', type=int, metavar='MB', nargs='?', const=256,
+                        help='Benchmark content signature matching on MB of synthetic data (default: 256)')
+    parser.add_argument('--content-max-mb', type=int, default=CONTENT_SCAN_MAX_BYTES // (1024 * 1024),
+                        help='Search at most this many MB of each file for content signatures (0 = whole file)')
+    parser.add_argument('--no-content-scan', action='store_true', help='Disable content signature matching')
+    parser.add_argument('--max-read-mb', type=float, default=GOVERNOR_MAX_BYTES_PER_SECOND / (1024 * 1024),
+                        help='Governor: MB read per second for hashing and content scans (0 = unlimited)')
+    parser.add_argument('--max-files-per-second', type=int, default=GOVERNOR_MAX_FILES_PER_SECOND,
+                        help='Governor: files stat\'ed per second by the walkers (0 = unlimited)')
+    parser.add_argument('--cpu-share', type=float, default=GOVERNOR_CPU_SHARE,
+                        help='Governor: target fraction of one CPU, e.g. 0.25 (0 = unlimited)')
+    parser.add_argument('--load-high', type=float, default=GOVERNOR_LOAD_HIGH,
+                        help=f'Governor: back off above this load average per CPU (default: {GOVERNOR_LOAD_HIGH})')
+    parser.add_argument('--load-cpu-share', type=float, default=GOVERNOR_LOAD_CPU_SHARE,
+                        help='Governor: CPU share while backing off with no --cpu-share set '
+                             f'(default: {GOVERNOR_LOAD_CPU_SHARE}, 0 = no load backoff)')
+    parser.add_argument('--io-idle', action='store_true', help='Run in the idle I/O scheduling class')
+    parser.add_argument('--phase-deadline', type=float, default=RADAR_ONESHOT_DEADLINE, metavar='SECONDS',
+                        help='With --scan: stop each scan phase after SECONDS (default: no limit; '
+                             '--monitor scales its deadlines to the interval)')
+    parser.add_argument('--metrics', metavar='ADDRESS', default=METRICS_ADDRESS,
+                        help="With --monitor: serve metrics at 'host:port' or 'unix:/path'")
+    parser.add_argument('--open-threats', action='store_true', help='Print currently open threats and exit')
+    parser.add_argument('--min-severity', choices=list(SEVERITY_RANK), help='With --open-threats: minimum severity')
+    parser.add_argument('--hash-mmap', action='store_true', help='Hash files through mmap instead of read buffers')
+    parser.add_argument('--hash-workers', type=int, default=HASH_WORKERS,
+                        help=f'Hashing workers for removable-device scans (default: {HASH_WORKERS})')
+    parser.add_argument('--hash-pool', choices=['thread', 'process'], default=HASH_POOL_KIND,
+                        help='Hashing worker pool type (default: thread)')
     
     args = parser.parse_args()
     
-    if args.monitor:
+    HASH_MAX_BYTES = args.hash_max_mb * 1024 * 1024
+    HASH_USE_MMAP = args.hash_mmap
+    HASH_WORKERS = args.hash_workers
+    HASH_POOL_KIND = args.hash_pool
+    CONTENT_SCAN_ENABLED = not args.no_content_scan
+    CONTENT_SCAN_MAX_BYTES = args.content_max_mb * 1024 * 1024
+    GOVERNOR_MAX_BYTES_PER_SECOND = int(args.max_read_mb * 1024 * 1024)
+    GOVERNOR_MAX_FILES_PER_SECOND = args.max_files_per_second
+    GOVERNOR_CPU_SHARE = args.cpu_share
+    GOVERNOR_LOAD_HIGH = args.load_high
+    GOVERNOR_LOAD_CPU_SHARE = args.load_cpu_share
+    GOVERNOR_IO_IDLE = GOVERNOR_IO_IDLE or args.io_idle
+    RADAR_ONESHOT_DEADLINE = args.phase_deadline
+    GOVERNOR.configure()
+    METRICS_ADDRESS = args.metrics
+    if GOVERNOR_IO_IDLE:
+        GOVERNOR.enable_io_idle()
+    
+    if args.open_threats:
+        print(json.dumps(THREAT_STATE.open_threats(args.min_severity), indent=2))
+    elif args.benchmark_content:
+        print(json.dumps(benchmark_content_matcher(args.benchmark_content), indent=2))
+    elif args.benchmark_netparse:
+        print(json.dumps(benchmark_net_parser(args.benchmark_netparse), indent=2))
+    elif args.benchmark_matcher:
+        print(json.dumps(benchmark_signature_matcher(args.benchmark_matcher), indent=2))
+    elif args.monitor:
         if args.daemon:
             # Fork to background
             pid = os.fork()
@@ -549,9 +3385,9 @@ def main():
             else:
                 # Child - run radar
                 os.setsid()
-                radar_monitor(args.interval)
+                run_monitor(args)
         else:
-            radar_monitor(args.interval)
+            run_monitor(args)
     elif args.scan:
         threats = radar_scan()
         print(f"\n✅ Scan complete: {len(threats)} threats detected")